@@ -4,9 +4,17 @@
 # Requisitos: pip install pandas matplotlib openpyxl
 
 from pathlib import Path
+import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from agregacao import agregar_cubo, fatia, niveis_presentes
+from cache_cubo import cubo_em_cache
+from cache_planilha import carregar_com_cache
+from instrumentacao import etapa, medir_figura
+import instrumentacao
+from regras import montar_tabela
+from renderizador import renderizador_padrao
 
 # =================== CONFIGURE AQUI ===================
 XLSX_PATH = Path("CenarioApenasLifetime.xlsx")
@@ -35,13 +43,6 @@ def norm_conseq(c: str):
     if "length" in s or "long" in s: return "lengthy"
     return c
 
-def split_antecedente_valor(s: str):
-    s = str(s)
-    if "=" in s:
-        a, v = s.split("=", 1)
-        return a.strip(), v.strip()
-    return s.strip(), ""
-
 def carregar_df(xlsx_path: Path, sheet_name=None):
     raw = pd.read_excel(xlsx_path, sheet_name=sheet_name)
     if isinstance(raw, dict):
@@ -50,105 +51,61 @@ def carregar_df(xlsx_path: Path, sheet_name=None):
                 raw = v
                 break
 
-    col_ante = "Antecendente"
-    col_cons = "Consequente"
-    col_lift = "Lift"
-    col_dari = "Daricelio"
-
-    ants, vals = [], []
-    for s in raw[col_ante]:
-        a, v = split_antecedente_valor(s)
-        ants.append(a)
-        vals.append(v)
-
-    df = pd.DataFrame({
-        "Antecedente": ants,
-        "ValorAnt": vals,
-        "Consequente": raw[col_cons].astype(str),
-        "BasesPython": pd.to_numeric(raw[col_lift], errors="coerce"),
-        "Referencia": pd.to_numeric(raw[col_dari], errors="coerce"),
-    }).dropna(subset=["BasesPython","Referencia"], how="any").reset_index(drop=True)
-    return df
-
-def grafico_por_valor(df_ant, valor_normalizado: str, out_png: Path):
-    sub = df_ant[df_ant["ValCat"] == valor_normalizado].copy()
-    if sub.empty:
+    # "Antecendente" (com 'c' extra), "Consequente", "Lift" e "Daricelio"
+    return montar_tabela(raw, {"Lift": "BasesPython", "Daricelio": "Referencia"})
+
+def grafico_por_valor(cubo, valor_normalizado: str, out_png: Path):
+    # cubo: médias por (ValCat, ConsCat) do antecedente
+    if valor_normalizado not in niveis_presentes(cubo):
         return False
 
-    agg = sub.groupby("ConsCat", as_index=False).agg(
-        BasesPython=("BasesPython","mean"),
-        Referencia=("Referencia","mean")
-    )
-
-    agg["ConsCat"] = pd.Categorical(agg["ConsCat"], categories=CONSEQ_ORDER, ordered=True)
-    agg = agg.sort_values("ConsCat")
-
-    # --- Estilo geral ---
-    plt.style.use("default")
-    plt.rcParams.update({
-        "font.family": "Arial",
-        "axes.edgecolor": "black",
-        "axes.linewidth": 1.0,
-        "axes.titlesize": 13,
-        "axes.labelsize": 11,
-        "legend.fontsize": 10,
-        "figure.facecolor": "white"
-    })
+    agg = fatia(cubo, valor_normalizado, CONSEQ_ORDER)
 
+    # figura/artistas reaproveitados entre os gráficos (ver renderizador.py)
     x = np.arange(len(CONSEQ_ORDER))
-    width = 0.35
-
-    plt.figure(figsize=(8.5, 4.5))
-    bars1 = plt.bar(x - width/2, agg["BasesPython"].values, width=width, label="Bases Python", color="#4C72B0")
-    bars2 = plt.bar(x + width/2, agg["Referencia"].values, width=width, label="Referência", color="#8C8C8C")
-
-    # Rótulos com valor
-    for bars in [bars1, bars2]:
-        for bar in bars:
-            yval = bar.get_height()
-            plt.text(
-                bar.get_x() + bar.get_width()/2,
-                yval + 0.02,
-                f"{yval:.2f}",
-                ha="center",
-                va="bottom",
-                fontsize=9,
-                color="#333333"
-            )
-
-    plt.xticks(x, CONSEQ_ORDER)
-    plt.xlabel("Consequente")
-    plt.ylabel("Lift")
-    plt.title(f"{ANTECEDENT_KEY.replace('_',' ')} — {valor_normalizado}", pad=20)
-    plt.legend(frameon=False)
-    plt.ylim(0, max(agg["BasesPython"].max(), agg["Referencia"].max()) * 1.2)
-
-    # Margens generosas para evitar corte
-    plt.subplots_adjust(top=0.88, bottom=0.15, left=0.12, right=0.95)
-
-    plt.savefig(out_png, bbox_inches="tight", dpi=300)
-    plt.close()
+    title = f"{ANTECEDENT_KEY.replace('_',' ')} — {valor_normalizado}"
+    renderizador_padrao().desenhar(x, agg["BasesPython"].values, agg["Referencia"].values,
+                                   CONSEQ_ORDER, title, out_png)
     return True
 
-def main():
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=f"Um gráfico por valor de {ANTECEDENT_KEY}.")
+    instrumentacao.argumentos(ap)
+    instrumentacao.iniciar_se_pedido(ap.parse_args(argv), "Comparativo3.py")
+
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    df = carregar_df(XLSX_PATH, SHEET_NAME)
+    def montar_cubo():
+        with etapa("carga"):
+            df = carregar_com_cache(carregar_df, XLSX_PATH, SHEET_NAME)
+
+        with etapa("normalizacao"):
+            sub = df[df["Antecedente"].str.fullmatch(ANTECEDENT_KEY, case=False, na=False)].copy()
+            if sub.empty:
+                raise SystemExit(f"Nenhum dado para antecedente '{ANTECEDENT_KEY}'.")
 
-    sub = df[df["Antecedente"].str.fullmatch(ANTECEDENT_KEY, case=False, na=False)].copy()
-    if sub.empty:
-        raise SystemExit(f"Nenhum dado para antecedente '{ANTECEDENT_KEY}'.")
+            sub["ValCat"]  = sub["ValorAnt"].apply(norm_value)
+            sub["ConsCat"] = sub["Consequente"].apply(norm_conseq)
 
-    sub["ValCat"]  = sub["ValorAnt"].apply(norm_value)
-    sub["ConsCat"] = sub["Consequente"].apply(norm_conseq)
+        # médias de todas as células (ValCat, ConsCat) num único groupby
+        with etapa("agregacao"):
+            return agregar_cubo(sub, chaves=("ValCat", "ConsCat"))
 
-    values_present = [v for v in ["1 line","some lines","many lines"] if v in sub["ValCat"].unique()]
+    # cubo pronto em .cache_cubos/ se a planilha e as normalizações não mudaram
+    with etapa("cubo"):
+        cubo = cubo_em_cache(montar_cubo, XLSX_PATH, SHEET_NAME,
+                             normalizadores=(ANTECEDENT_KEY, norm_value, norm_conseq),
+                             espec=(montar_cubo, carregar_df, montar_tabela, agregar_cubo))
+    values_present = [v for v in ["1 line","some lines","many lines"] if v in niveis_presentes(cubo)]
 
     print(f"Gerando gráficos para {ANTECEDENT_KEY}: {values_present}")
-    for val in values_present:
-        out_png = OUT_DIR / f"{ANTECEDENT_KEY}__{val.replace(' ','_')}.png"
-        ok = grafico_por_valor(sub, val, out_png)
-        if ok:
-            print(" - Gerado:", out_png)
+    with etapa("render"):
+        for val in values_present:
+            out_png = OUT_DIR / f"{ANTECEDENT_KEY}__{val.replace(' ','_')}.png"
+            with medir_figura(out_png):
+                ok = grafico_por_valor(cubo, val, out_png)
+            if ok:
+                print(" - Gerado:", out_png)
+    instrumentacao.encerrar(OUT_DIR)
 
 if __name__ == "__main__":
     main()
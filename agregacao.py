@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Agregação única (Antecedente, ValCat, ConsCat) -> médias de Lift/Referência.
+# Em vez de filtrar o DataFrame por antecedente e por valor e rodar um groupby
+# por gráfico, o "cubo" é calculado num único groupby e os gráficos só leem
+# fatias dele.
+#
+# Requisitos: pip install pandas
+
+import pandas as pd
+
+CHAVES_CUBO = ("Antecedente", "ValCat", "ConsCat")
+MEDIDAS_CUBO = ("BasesPython", "Referencia")
+
+
+def agregar_cubo(df: pd.DataFrame, medidas=MEDIDAS_CUBO, chaves=CHAVES_CUBO) -> pd.DataFrame:
+    """Média de cada medida por célula, num único groupby (índice MultiIndex = chaves)."""
+    return df.groupby(list(chaves), observed=True, sort=True)[list(medidas)].mean()
+
+
+def fatia(cubo: pd.DataFrame, chave, ordem) -> pd.DataFrame:
+    """cubo.loc[chave] reindexado na ordem do eixo X (NaN onde não há regra)."""
+    try:
+        parte = cubo.loc[chave]
+    except KeyError:
+        return pd.DataFrame(index=pd.Index(ordem), columns=cubo.columns, dtype=float)
+    return parte.reindex(ordem)
+
+
+def matriz(cubo: pd.DataFrame, medida: str, linhas, colunas, chave=None) -> pd.DataFrame:
+    """Tabela linhas x colunas (ex.: ValCat x ConsCat) de uma medida do cubo."""
+    parte = cubo if chave is None else cubo.loc[chave]
+    return parte[medida].unstack(-1).reindex(index=linhas, columns=colunas)
+
+
+def niveis_presentes(cubo: pd.DataFrame, chave=None, nivel: int = 0) -> list:
+    """Valores observados de um nível do cubo (opcionalmente dentro de cubo.loc[chave])."""
+    parte = cubo if chave is None else cubo.loc[chave]
+    return parte.index.get_level_values(nivel).unique().tolist()
+
+
+class AgregadorIncremental:
+    """Mesmo cubo do agregar_cubo, mas alimentado bloco a bloco (soma e contagem por célula).
+
+    A memória depende só do número de células distintas, não do número de regras.
+    """
+
+    def __init__(self, medidas=MEDIDAS_CUBO, chaves=CHAVES_CUBO):
+        self.medidas = list(medidas)
+        self.chaves = list(chaves)
+        self.linhas = 0
+        self._soma = None
+        self._n = None
+
+    def adicionar(self, df: pd.DataFrame):
+        self.linhas += len(df)
+        g = df.groupby(self.chaves, observed=True)[self.medidas]
+        soma, n = g.sum().astype("float64"), g.count()  # acumula em float64 entre blocos
+        # níveis categóricos mudam de bloco para bloco: alinha por valor
+        niveis = [nivel.astype(object) for nivel in soma.index.levels]
+        soma.index = soma.index.set_levels(niveis)
+        n.index = soma.index
+        if self._soma is None:
+            self._soma, self._n = soma, n
+        else:
+            self._soma = self._soma.add(soma, fill_value=0)
+            self._n = self._n.add(n, fill_value=0)
+
+    def cubo(self) -> pd.DataFrame:
+        if self._soma is None:
+            idx = pd.MultiIndex.from_tuples([], names=self.chaves)
+            return pd.DataFrame(index=idx, columns=self.medidas, dtype=float)
+        return (self._soma / self._n).sort_index()
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+# Benchmarks do pipeline dos gráficos.
+#
+#   python benchmark.py suite [--tamanhos 1k,100k,1M] [--saida resultados.json]
+#       gera planilhas sintéticas de regras (vocabulário do ANT_CONFIG/CONSEQ_ORDER)
+#       e mede tempo e pico de memória de cada etapa do comparativo4:
+#       carga (carregar_df), normalização (norm_*), agregação (groupby) e render
+#
+#   python benchmark.py comparar antes.json depois.json [--tolerancia 0.15]
+#       compara dois resultados da suite (ex.: de commits diferentes)
+#
+#   python benchmark.py render [--graficos 40] [--dpi 300]
+#       latência por gráfico: o plot_par_barras original (pyplot, estilo e
+#       figura refeitos a cada gráfico) vs RenderizadorBarras com figura nova
+#       vs figura/artistas reaproveitados
+#
+#   python benchmark.py rotulos [--consequentes 4,12,24] [--graficos 20] [--dpi 300]
+#       rótulos das barras: um Text por barra (antes) vs uma camada só por
+#       eixo (CamadaRotulos) vs sem rótulos (perfil esboco), por nº de consequentes
+#
+#   python benchmark.py gravacao [--graficos 40] [--dpi 100] [--latencia-ms 20] [--pasta P]
+#       tempo total de render + gravação por modo (gravacao.py): direta,
+#       lote (thread) e zip; --latencia-ms simula o custo por arquivo de um
+#       disco de rede (aponte --pasta para um compartilhamento p/ medir o real)
+#
+#   python benchmark.py cubo [--antecedentes 9] [--valores 3] [--dpi 300]
+#       por antecedente: um gráfico de barras por valor (--saida png) vs um
+#       mapa de calor valor × consequente (--saida cubo), com e sem os números
+#
+#   python benchmark.py mineracao [--prs 1M] [--por-base]
+#       tempo do mineracao.minerar_regras (contagens por bincount) em PRs sintéticos
+#
+#   python benchmark.py inicio [--repeticoes 5]
+#       tempo de processo novo (import, --so-cache, reexecução sem nada a
+#       redesenhar, 1º gráfico) e se o matplotlib chegou a ser importado
+#
+# Requisitos: pip install pandas numpy matplotlib openpyxl
+
+from pathlib import Path
+from functools import partial
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import comparativo4
+from agregacao import agregar_cubo
+from gravacao import MODOS as MODOS_GRAVACAO, EmMemoria, Gravador, GravadorZip, arquivo_zip
+from renderizador import RenderizadorBarras, RenderizadorCubo, pyplot
+
+DADOS_DIR = Path(".benchmark_dados")
+ETAPAS = ("carga", "normalizacao", "agregacao", "render")
+
+CONSEQS = ["very short", "short", "medium", "lengthy"]
+
+
+def _dados_graficos(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(len(CONSEQS))
+    for i in range(n):
+        y1, y2 = rng.uniform(0.3, 3.0, (2, len(CONSEQS))).round(2)
+        yield x, y1, y2, CONSEQS, f"grafico {i}"
+
+
+def _plot_par_barras_original(x, y1, y2, labels, title, out_png, dpi=300):
+    # o plot_par_barras do comparativo4 antes do RenderizadorBarras (linha de base)
+    plt = pyplot()
+    plt.style.use("default")
+    plt.rcParams.update({
+        "font.family": "Arial",
+        "axes.edgecolor": "black",
+        "axes.linewidth": 1.0,
+        "axes.titlesize": 13,
+        "axes.labelsize": 11,
+        "legend.fontsize": 10,
+        "figure.facecolor": "white"
+    })
+
+    width = 0.35
+    plt.figure(figsize=(8.5, 4.5))
+    bars1 = plt.bar(x - width/2, y1, width=width, label="Bases Python", color="#4C72B0")
+    bars2 = plt.bar(x + width/2, y2, width=width, label="Referência",  color="#8C8C8C")
+
+    for bars in (bars1, bars2):
+        for bar in bars:
+            yval = bar.get_height()
+            plt.text(bar.get_x()+bar.get_width()/2, yval+0.02, f"{yval:.2f}",
+                     ha="center", va="bottom", fontsize=9, color="#333333")
+
+    plt.xticks(x, labels)
+    plt.xlabel("Consequente")
+    plt.ylabel("Lift")
+    plt.title(title, pad=20)
+    plt.legend(frameon=False)
+    ymax = max(np.nanmax(y1), np.nanmax(y2))
+    plt.ylim(0, ymax*1.2 if np.isfinite(ymax) else 1)
+    plt.subplots_adjust(top=0.88, bottom=0.15, left=0.12, right=0.95)
+    plt.savefig(out_png, bbox_inches="tight", dpi=dpi)
+    plt.close()
+
+
+def bench_render(n_graficos=40, dpi=300):
+    resultados = {}
+    casos = (("pyplot_original", None), ("figura_nova", False), ("template", True))
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome, reutilizar in casos:
+            if reutilizar is None:
+                desenhar = partial(_plot_par_barras_original, dpi=dpi)
+            else:
+                desenhar = RenderizadorBarras(reutilizar=reutilizar, dpi=dpi).desenhar
+            tempos = []
+            for i, (x, y1, y2, labels, title) in enumerate(_dados_graficos(n_graficos)):
+                t0 = time.perf_counter()
+                desenhar(x, y1, y2, labels, title, Path(tmp) / f"{nome}_{i}.png")
+                tempos.append(time.perf_counter() - t0)
+            tempos = np.array(tempos[1:])  # o 1º inclui montagem/fontes
+            resultados[nome] = {
+                "graficos": n_graficos,
+                "dpi": dpi,
+                "media_ms": round(tempos.mean()*1000, 2),
+                "mediana_ms": round(float(np.median(tempos))*1000, 2),
+            }
+    base = resultados["pyplot_original"]["mediana_ms"]
+    for nome in ("figura_nova", "template"):
+        resultados[nome]["ganho_vs_original"] = round(1 - resultados[nome]["mediana_ms"] / base, 3)
+    return resultados
+
+
+def bench_rotulos(consequentes=(4, 12, 24), n_graficos=20, dpi=300):
+    rng = np.random.default_rng(0)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in consequentes:
+            labels = [f"c{i}" for i in range(n)]
+            dados = rng.uniform(0.3, 3.0, (n_graficos, 2, n)).round(2)
+            linha = {}
+            for nome, rotulos in (("texto", "texto"), ("colecao", "colecao"), ("sem_rotulos", None)):
+                r = RenderizadorBarras(dpi=dpi, rotulos=rotulos)
+                tempos = []
+                for i, (y1, y2) in enumerate(dados):
+                    r.desenhar(None, y1, y2, labels, f"grafico {i}", Path(tmp) / f"{nome}_{n}_{i}.png")
+                    tempos.append(r.ultimo_tempo["artistas_s"] + r.ultimo_tempo["savefig_s"])
+                linha[f"{nome}_ms"] = round(float(np.median(tempos[1:]))*1000, 2)  # 1º: montagem/fontes
+            linha["ganho_colecao"] = round(1 - linha["colecao_ms"] / linha["texto_ms"], 3)
+            resultados[f"{n}_consequentes"] = linha
+    return {"dpi": dpi, "graficos": n_graficos, **resultados}
+
+
+class _GravadorLento(Gravador):
+    # latência simulada por arquivo, como a do savefig direto
+    latencia = 0.0
+
+    def _gravar_lote(self, lote):
+        time.sleep(self.latencia * len(lote))
+        super()._gravar_lote(lote)
+
+
+def bench_gravacao(n_graficos=40, dpi=100, latencia_ms=0.0, pasta=None):
+    latencia = latencia_ms / 1000
+    dados = list(_dados_graficos(n_graficos))
+    resultados = {"graficos": n_graficos, "dpi": dpi, "latencia_ms": latencia_ms}
+    with tempfile.TemporaryDirectory(dir=pasta) as tmp:
+        r = RenderizadorBarras(dpi=dpi)
+        r.desenhar(*dados[0][:-1], "g", Path(tmp) / "aquecimento.png")  # montagem/fontes fora da conta
+        for modo in MODOS_GRAVACAO:
+            out_dir = Path(tmp) / modo
+            t0 = time.perf_counter()
+            if modo == "direta":
+                for i, (x, y1, y2, labels, title) in enumerate(dados):
+                    destino = out_dir / f"a{i % 8}" / f"{i}.png"
+                    destino.parent.mkdir(parents=True, exist_ok=True)
+                    r.desenhar(x, y1, y2, labels, title, destino)
+                    time.sleep(latencia)
+                t_render = time.perf_counter() - t0
+            else:
+                _GravadorLento.latencia = latencia
+                gravador = GravadorZip(arquivo_zip(out_dir), out_dir) if modo == "zip" else _GravadorLento()
+                with gravador:
+                    for i, (x, y1, y2, labels, title) in enumerate(dados):
+                        alvo = EmMemoria(out_dir / f"a{i % 8}" / f"{i}.png")
+                        r.desenhar(x, y1, y2, labels, title, alvo)
+                        gravador.gravar(alvo.name, alvo.getvalue())
+                    t_render = time.perf_counter() - t0
+            resultados[modo] = {"render_s": round(t_render, 3),
+                                "total_s": round(time.perf_counter() - t0, 3)}
+    return resultados
+
+
+def bench_cubo(n_antecedentes=9, n_valores=3, dpi=300):
+    rng = np.random.default_rng(0)
+    x = np.arange(len(CONSEQS))
+    valores = [f"valor {v}" for v in range(n_valores)]
+    dados = [rng.uniform(0.3, 3.0, (2, n_valores, len(CONSEQS))).round(2)
+             for _ in range(n_antecedentes)]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        modos = (("barras", RenderizadorBarras(dpi=dpi)),
+                 ("cubo", RenderizadorCubo(dpi=dpi)),
+                 ("cubo_sem_numeros", RenderizadorCubo(dpi=dpi, anotar=False)))
+        for nome, r in modos:
+            tempos, arquivos = [], 0
+            for a, (bases, ref) in enumerate(dados):
+                t0 = time.perf_counter()
+                if nome == "barras":
+                    for v in range(n_valores):
+                        r.desenhar(x, bases[v], ref[v], CONSEQS, f"ant {a} — {v}",
+                                   Path(tmp) / f"{nome}_{a}_{v}.png")
+                        arquivos += 1
+                else:
+                    r.desenhar(valores, CONSEQS, bases, ref, f"ant {a}", Path(tmp) / f"{nome}_{a}.png")
+                    arquivos += 1
+                tempos.append(time.perf_counter() - t0)
+            tempos = np.array(tempos[1:])  # o 1º inclui montagem/fontes
+            resultados[nome] = {
+                "arquivos": arquivos,
+                "dpi": dpi,
+                "total_s": round(tempos.sum(), 3),
+                "por_antecedente_ms": round(tempos.mean()*1000, 2),
+            }
+    return resultados
+
+
+def gerar_prs(n: int, seed: int = 0) -> pd.DataFrame:
+    """PRs sintéticos: um atributo discretizado por coluna (vocabulário do ANT_CONFIG)."""
+    rng = np.random.default_rng(seed)
+    colunas = {ant: np.array(ordem, dtype=object)[rng.integers(0, len(ordem), n)]
+               for ant, (_, ordem) in comparativo4.ANT_CONFIG.items()}
+    colunas["life_time"] = np.array(comparativo4.CONSEQ_ORDER, dtype=object)[rng.integers(0, 4, n)]
+    colunas["Base"] = np.array(["Commcare", "Django", "Flask"], dtype=object)[rng.integers(0, 3, n)]
+    return pd.DataFrame(colunas)
+
+
+def bench_mineracao(n_prs: int, por_base: bool = False, repeticoes: int = 3):
+    from mineracao import minerar_regras
+
+    prs = gerar_prs(n_prs)
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        regras = minerar_regras(prs, por="Base" if por_base else None)
+        tempos.append(time.perf_counter() - t0)
+    return {"prs": n_prs, "por_base": por_base, "regras": len(regras),
+            "melhor_s": round(min(tempos), 3), "mediana_s": round(float(np.median(tempos)), 3)}
+
+
+def _tamanho(txt: str) -> int:
+    txt = txt.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(txt[-1], 1)
+    return int(float(txt.rstrip("km")) * mult)
+
+
+def gerar_planilha(n: int, destino: Path, seed: int = 0):
+    """XLSX sintético no formato das exportações (Antecendente/Consequente/Lift/Daricelio)."""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    # valores canônicos + grafias alternativas que os norm_* precisam resolver
+    antecedentes = []
+    for ant, (_, ordem) in comparativo4.ANT_CONFIG.items():
+        for v in ordem:
+            antecedentes += [f"{ant}={v}", f"{ant}={v.upper()}", f"{ant} = {v} "]
+    antecedentes += ["life_time=very short", "life_time=lengthy"]
+    consequentes = [f"life_time={c}" for c in comparativo4.CONSEQ_ORDER] + ["status=accepeted", "status=rejected"]
+
+    ants = np.array(antecedentes, dtype=object)[rng.integers(0, len(antecedentes), n)]
+    cons = np.array(consequentes, dtype=object)[rng.integers(0, len(consequentes), n)]
+    lift = rng.uniform(0.2, 3.0, n).round(2)
+    dari = (lift + rng.normal(0, 0.2, n)).round(2)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Planilha1")
+    ws.append(["Antecendente", "Consequente", "Lift", "Daricelio"])
+    for linha in zip(ants, cons, lift.tolist(), dari.tolist()):
+        ws.append(linha)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(destino)
+
+
+def _planilha(n: int, seed: int = 0) -> Path:
+    destino = DADOS_DIR / f"regras_{n}_{seed}.xlsx"
+    if not destino.exists():  # gerar 1M linhas demora: reaproveita entre execuções
+        print(f"gerando {destino} ...")
+        gerar_planilha(n, destino, seed)
+    return destino
+
+
+def _medir(fn, *args, memoria=True):
+    t0 = time.perf_counter()
+    resultado = fn(*args)
+    medida = {"tempo_s": round(time.perf_counter() - t0, 4)}
+    if memoria:
+        # segunda passada com tracemalloc (não distorce o tempo acima)
+        tracemalloc.start()
+        fn(*args)
+        medida["pico_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return resultado, medida
+
+
+def _render(cubo, n_graficos):
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):  # sem o log por antecedente
+            graficos = comparativo4.preparar_graficos(cubo, Path(tmp))[:n_graficos]
+        for g in graficos:
+            g[-1].parent.mkdir(parents=True, exist_ok=True)
+            comparativo4.plot_par_barras(*g)
+    return len(graficos)
+
+
+def bench_suite(tamanhos, n_graficos=10, memoria=True):
+    resultados = []
+    for n in tamanhos:
+        arq = _planilha(n)
+        print(f"\n[{n} regras] {arq}")
+        linha = {"regras": n}
+        df, linha["carga"] = _medir(comparativo4.carregar_df, arq, "Planilha1", memoria=memoria)
+        norm, linha["normalizacao"] = _medir(comparativo4.normalizar_regras, df, memoria=memoria)
+        cubo, linha["agregacao"] = _medir(agregar_cubo, norm, memoria=memoria)
+        feitos, linha["render"] = _medir(_render, cubo, n_graficos, memoria=False)
+        linha["render"]["graficos"] = feitos
+        linha["render"]["por_grafico_s"] = round(linha["render"]["tempo_s"] / max(feitos, 1), 4)
+        for etapa in ETAPAS:
+            print(f"  {etapa:13s} {linha[etapa]}")
+        resultados.append(linha)
+    return {"meta": _meta(), "resultados": resultados}
+
+
+# roda `codigo` num processo novo e devolve o tempo dele + se o matplotlib foi importado
+_DRIVER = """
+import sys, time, json, runpy
+t0 = time.perf_counter()
+sys.argv = {argv!r}
+{codigo}
+json.dump({{"tempo_s": time.perf_counter() - t0,
+            "matplotlib": "matplotlib" in sys.modules,
+            "pyplot": "matplotlib.pyplot" in sys.modules}}, sys.stderr)
+"""
+
+
+def _processo_novo(codigo, argv=("x",), cwd=None):
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent), COMPARATIVO_LOTE="1")
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-c", _DRIVER.format(codigo=codigo, argv=list(argv))],
+                       cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    total = time.perf_counter() - t0
+    medida = json.loads(p.stderr.strip().splitlines()[-1])
+    medida["processo_s"] = total  # inclui o boot do interpretador
+    return medida
+
+
+def bench_inicio(repeticoes=5):
+    arq = _planilha(1_000).resolve()
+    roda = "runpy.run_module('comparativo4', run_name='__main__')"
+    cenarios = {
+        "import_comparativo4": ("import comparativo4", ("x",)),
+        "so_cache": (roda, ("comparativo4", "--so-cache", "--entrada", str(arq))),
+        "reexecucao_sem_mudancas": (roda, ("comparativo4", "--entrada", str(arq), "--perfil", "rascunho")),
+        "primeiro_grafico": ("from renderizador import renderizador_padrao\n"
+                             "renderizador_padrao('rascunho').desenhar(None, [1, 2], [2, 1], ['a', 'b'], 't', 'g.png')",
+                             ("x",)),
+    }
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1ª execução (fora da medida) gera cache e gráficos: as próximas não têm nada a redesenhar
+        _processo_novo(roda, cenarios["reexecucao_sem_mudancas"][1], cwd=tmp)
+        for nome, (codigo, argv) in cenarios.items():
+            medidas = [_processo_novo(codigo, argv, cwd=tmp) for _ in range(repeticoes)]
+            resultados[nome] = {
+                "mediana_ms": round(float(np.median([m["tempo_s"] for m in medidas]))*1000, 1),
+                "processo_ms": round(float(np.median([m["processo_s"] for m in medidas]))*1000, 1),
+                "matplotlib": medidas[-1]["matplotlib"],
+                "pyplot": medidas[-1]["pyplot"],
+            }
+            print(f"  {nome:25s} {resultados[nome]}")
+    return resultados
+
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import matplotlib
+    return {"commit": commit, "python": platform.python_version(), "pandas": pd.__version__,
+            "matplotlib": matplotlib.__version__, "maquina": platform.machine(),
+            "quando": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def comparar(antes: dict, depois: dict, tolerancia=0.15):
+    """Imprime a variação de tempo por etapa/tamanho; devolve o nº de regressões."""
+    base = {r["regras"]: r for r in antes["resultados"]}
+    regressoes = 0
+    print(f"antes: {antes['meta'].get('commit')}  depois: {depois['meta'].get('commit')}")
+    for r in depois["resultados"]:
+        a = base.get(r["regras"])
+        if a is None:
+            continue
+        for etapa in ETAPAS:
+            t0, t1 = a[etapa]["tempo_s"], r[etapa]["tempo_s"]
+            var = (t1 - t0) / t0 if t0 else 0.0
+            marca = "  <-- REGRESSÃO" if var > tolerancia else ""
+            regressoes += bool(marca)
+            print(f"  {r['regras']:>9} {etapa:13s} {t0:9.4f}s -> {t1:9.4f}s ({var:+.0%}){marca}")
+    return regressoes
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks do pipeline dos gráficos.")
+    sub = ap.add_subparsers(dest="etapa", required=True)
+    p = sub.add_parser("suite", help="tempo e memória por etapa em planilhas sintéticas")
+    p.add_argument("--tamanhos", default="1k,100k", help="ex.: 1k,100k,1M")
+    p.add_argument("--graficos", type=int, default=10, help="gráficos renderizados por tamanho")
+    p.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    p.add_argument("--saida", type=Path, help="grava o resultado em JSON")
+    p = sub.add_parser("comparar", help="compara dois JSONs da suite")
+    p.add_argument("antes", type=Path)
+    p.add_argument("depois", type=Path)
+    p.add_argument("--tolerancia", type=float, default=0.15)
+    p = sub.add_parser("render", help="latência por gráfico (pyplot original vs figura nova vs template)")
+    p.add_argument("--graficos", type=int, default=40)
+    p.add_argument("--dpi", type=int, default=300)
+    p = sub.add_parser("rotulos", help="rótulos das barras: Text por barra vs camada única vs nenhum")
+    p.add_argument("--consequentes", default="4,12,24", help="ex.: 4,12,24")
+    p.add_argument("--graficos", type=int, default=20)
+    p.add_argument("--dpi", type=int, default=300)
+    p = sub.add_parser("gravacao", help="render + gravação: direta vs thread em lotes vs zip")
+    p.add_argument("--graficos", type=int, default=40)
+    p.add_argument("--dpi", type=int, default=100)
+    p.add_argument("--latencia-ms", type=float, default=0.0, help="latência simulada por arquivo")
+    p.add_argument("--pasta", type=Path, help="onde gravar (padrão: pasta temporária local)")
+    p = sub.add_parser("cubo", help="barras por valor vs um mapa de calor por antecedente")
+    p.add_argument("--antecedentes", type=int, default=9)
+    p.add_argument("--valores", type=int, default=3)
+    p.add_argument("--dpi", type=int, default=300)
+    p = sub.add_parser("mineracao", help="regras mineradas direto dos PRs (bincount)")
+    p.add_argument("--prs", default="1M", help="ex.: 100k, 1M")
+    p.add_argument("--por-base", action="store_true", help="regras por projeto (coluna Base)")
+    p = sub.add_parser("inicio", help="tempo de inicialização dos CLIs (processo novo)")
+    p.add_argument("--repeticoes", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    if args.etapa == "suite":
+        tamanhos = [_tamanho(t) for t in args.tamanhos.split(",")]
+        res = bench_suite(tamanhos, args.graficos, memoria=not args.sem_memoria)
+        texto = json.dumps(res, indent=2, ensure_ascii=False)
+        if args.saida:
+            args.saida.write_text(texto, encoding="utf-8")
+            print("\nResultados em", args.saida)
+        else:
+            print(texto)
+    elif args.etapa == "comparar":
+        ler = lambda p: json.loads(p.read_text(encoding="utf-8"))
+        raise SystemExit(1 if comparar(ler(args.antes), ler(args.depois), args.tolerancia) else 0)
+    elif args.etapa == "render":
+        print(json.dumps(bench_render(args.graficos, args.dpi), indent=2))
+    elif args.etapa == "rotulos":
+        n = [int(c) for c in args.consequentes.split(",")]
+        print(json.dumps(bench_rotulos(n, args.graficos, args.dpi), indent=2))
+    elif args.etapa == "gravacao":
+        print(json.dumps(bench_gravacao(args.graficos, args.dpi, args.latencia_ms, args.pasta), indent=2))
+    elif args.etapa == "cubo":
+        print(json.dumps(bench_cubo(args.antecedentes, args.valores, args.dpi), indent=2))
+    elif args.etapa == "mineracao":
+        print(json.dumps(bench_mineracao(_tamanho(args.prs), args.por_base), indent=2))
+    elif args.etapa == "inicio":
+        print(json.dumps({"meta": _meta(), "inicio": bench_inicio(args.repeticoes)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
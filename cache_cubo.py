@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Cache em disco dos cubos agregados (médias por Antecedente/ValCat/ConsCat),
+# compartilhado entre comparativo (exportação do cubo), comparativo2,
+# Comparativo3, comparativo4, lote e quem mais pedir (notebook): com entrada
+# em cache o cubo sai do Parquet em milissegundos, sem carga + normalização +
+# groupby.
+#
+# A chave é o conteúdo, não o nome: hash dos bytes da planilha + aba +
+# identidade dos normalizadores (ANT_CONFIG / norm_*: bytecode e constantes)
+# + especificação da agregação (funções e parâmetros usados) + fontes do
+# projeto que o calcular/normalizadores/espec alcançam (cache_planilha.
+# hash_fontes: o que as funções chamam, métodos do RegistroNormalizadores...).
+# Mudou qualquer um deles, a chave muda e o cubo é refeito.
+#
+# A pasta tem tamanho limitado: ao gravar, os cubos usados há mais tempo
+# (mtime, atualizado a cada leitura) saem até caber em LIMITE_MB.
+#
+# Requisitos: pip install pandas pyarrow  (sem pyarrow, o cache é ignorado)
+
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import json
+import os
+import types
+
+import pandas as pd
+
+from cache_planilha import hash_fontes
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # sem pyarrow: sempre recalcula
+    pyarrow = None
+
+CACHE_DIR = Path(".cache_cubos")
+LIMITE_MB = 256
+
+
+@lru_cache(maxsize=64)
+def _hash_conteudo(caminho: str, mtime_ns: int, tamanho: int) -> str:
+    # mtime/tamanho só evitam reler o mesmo arquivo no mesmo processo
+    h = hashlib.sha1()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """sha1 dos bytes do arquivo."""
+    caminho = Path(caminho).resolve()
+    st = caminho.stat()
+    return _hash_conteudo(str(caminho), st.st_mtime_ns, st.st_size)
+
+
+def _codigo(co):
+    # bytecode + nomes + constantes (os textos comparados nos norm_* estão aqui);
+    # code objects aninhados (comprehensions, lambdas) entram recursivamente
+    return [co.co_code.hex(), list(co.co_names), [_constante(c) for c in co.co_consts]]
+
+
+def _constante(c):
+    if isinstance(c, types.CodeType):
+        return _codigo(c)
+    if isinstance(c, frozenset):  # `s in {...}`: ordem do repr varia com o PYTHONHASHSEED
+        return sorted(map(repr, c))
+    return repr(c)
+
+
+def identidade(obj):
+    """Descrição estável (JSON) de normalizadores/especificação para a chave do cache."""
+    if isinstance(obj, dict):
+        return {str(k): identidade(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, (list, tuple)):
+        return [identidade(v) for v in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted(map(repr, obj))
+    if isinstance(obj, (types.FunctionType, types.MethodType)):
+        func = getattr(obj, "__func__", obj)
+        return {"funcao": f"{func.__module__}.{func.__qualname__}", "codigo": _codigo(func.__code__)}
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        # ex.: RegistroNormalizadores -> ant_config, norm_conseq, conseq_order
+        # (os `_` são caches; o código da classe entra pelo hash_fontes)
+        return {"classe": type(obj).__qualname__,
+                **{k: identidade(v) for k, v in vars(obj).items() if not k.startswith("_")}}
+    return repr(obj)
+
+
+def chave_cubo(caminho: Path, sheet_name=None, normalizadores=None, espec=None,
+               calcular=None) -> str:
+    partes = [hash_arquivo(caminho), sheet_name, identidade(normalizadores), identidade(espec),
+              hash_fontes(calcular, normalizadores, espec)]
+    return hashlib.sha1(json.dumps(partes, default=str).encode("utf-8")).hexdigest()[:24]
+
+
+def despejar(cache_dir: Path = CACHE_DIR, limite_mb: float = LIMITE_MB, manter=None):
+    """Remove os cubos menos usados até a pasta caber em limite_mb; devolve os removidos."""
+    arquivos = []
+    for arq in Path(cache_dir).glob("*.parquet"):
+        try:
+            st = arq.stat()
+        except OSError:  # outro processo acabou de remover
+            continue
+        arquivos.append((st.st_mtime_ns, st.st_size, arq))
+    total = sum(tam for _, tam, _ in arquivos)
+    limite = limite_mb * 2**20
+    removidos = []
+    for _, tam, arq in sorted(arquivos, key=lambda a: a[0]):
+        if total <= limite:
+            break
+        if manter is not None and arq == Path(manter):
+            continue
+        arq.unlink(missing_ok=True)
+        total -= tam
+        removidos.append(arq)
+    return removidos
+
+
+def cubo_em_cache(calcular, caminho: Path, sheet_name=None, normalizadores=None, espec=None,
+                  cache_dir: Path = CACHE_DIR, limite_mb: float = LIMITE_MB) -> pd.DataFrame:
+    """Cubo de `caminho` lido do cache; calcular() só roda quando não há entrada válida."""
+    if pyarrow is None or cache_dir is None:
+        return calcular()
+
+    arq = Path(cache_dir) / f"{chave_cubo(caminho, sheet_name, normalizadores, espec, calcular)}.parquet"
+    if arq.exists():
+        try:
+            cubo = pd.read_parquet(arq)
+            os.utime(arq)  # LRU: mtime = último uso
+            print(f"[cache] cubo de {Path(caminho).name} lido de {arq}")
+            return cubo
+        except Exception as e:  # cache corrompido -> refaz
+            print(f"[cache] ignorando {arq.name}: {e}")
+
+    cubo = calcular()
+
+    arq.parent.mkdir(parents=True, exist_ok=True)
+    tmp = arq.with_suffix(f".{os.getpid()}.tmp")
+    cubo.to_parquet(tmp)  # índice (MultiIndex categórico) vai junto
+    os.replace(tmp, arq)
+    despejar(arq.parent, limite_mb, manter=arq)
+    return cubo
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Cache colunar (Parquet/Arrow) na frente do carregar_df de cada script.
+# O XLSX é lido pelo openpyxl só na primeira vez; depois o DataFrame já
+# normalizado é lido direto do Parquet (memory-map), sem abrir a planilha.
+# O cache é refeito sozinho quando o arquivo muda (mtime/tamanho) ou quando
+# muda o código que monta o DataFrame: o carregar_df e tudo do projeto que ele
+# usa (regras.montar_tabela, normalizadores, ...), pelo hash dos fontes.
+#
+# Requisitos: pip install pandas pyarrow  (sem pyarrow, o cache é ignorado)
+
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import inspect
+import json
+import os
+import types
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # sem pyarrow: carrega direto da planilha
+    pyarrow = None
+
+CACHE_DIR = Path(".cache_planilhas")
+RAIZ_PROJETO = Path(__file__).resolve().parent  # só os .py daqui entram no hash do código
+
+
+def _hash(*partes):
+    return hashlib.sha1(json.dumps(partes, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def _arquivo_projeto(obj, raiz: Path):
+    try:
+        arq = Path(inspect.getsourcefile(obj)).resolve()
+    except (TypeError, OSError):  # builtin, extensão C, código sem arquivo
+        return None
+    return arq if arq.parent == raiz else None
+
+
+def _nomes_globais(co):
+    # nomes globais/atributos usados pelo código, inclusive em comprehensions e lambdas
+    nomes = list(co.co_names)
+    for c in co.co_consts:
+        if isinstance(c, types.CodeType):
+            nomes += _nomes_globais(c)
+    return nomes
+
+
+def arquivos_fonte(*objs, raiz: Path = None) -> list:
+    """Arquivos .py do projeto de que os objetos dependem.
+
+    O arquivo de cada função/classe/módulo e, recursivamente, os dos nomes
+    globais que o código usa (funções, classes, módulos do projeto e objetos
+    como o RegistroNormalizadores com as funções e dicionários que guardam).
+    Bibliotecas de fora (pandas, numpy) ficam de fora.
+    """
+    raiz = Path(RAIZ_PROJETO if raiz is None else raiz).resolve()
+    arquivos, vistos = set(), set()
+    pendentes = list(objs)
+    while pendentes:
+        obj = pendentes.pop()
+        if id(obj) in vistos:
+            continue
+        vistos.add(id(obj))
+        if isinstance(obj, (dict, list, tuple, set, frozenset)):
+            pendentes += list(obj.items()) if isinstance(obj, dict) else list(obj)
+            continue
+        if isinstance(obj, types.MethodType):
+            obj = obj.__func__
+        if isinstance(obj, (types.FunctionType, type, types.ModuleType)):
+            arq = _arquivo_projeto(obj, raiz)
+        elif hasattr(obj, "__dict__"):  # instância de classe do projeto
+            arq = _arquivo_projeto(type(obj), raiz)
+        else:
+            continue
+        if arq is None:
+            continue
+        arquivos.add(arq)
+        if isinstance(obj, types.FunctionType):
+            pendentes += [obj.__globals__[n] for n in _nomes_globais(obj.__code__) if n in obj.__globals__]
+            pendentes += [c.cell_contents for c in obj.__closure__ or () if c.cell_contents is not None]
+            pendentes += list(obj.__defaults__ or ())
+        elif isinstance(obj, types.ModuleType):
+            pendentes += [v for v in vars(obj).values() if getattr(v, "__module__", None) == obj.__name__]
+        elif isinstance(obj, type):
+            pendentes += list(vars(obj).values())
+        else:
+            pendentes += [type(obj), *vars(obj).values()]
+    return sorted(arquivos)
+
+
+@lru_cache(maxsize=256)
+def _hash_fonte(caminho: str, mtime_ns: int, tamanho: int) -> str:
+    return hashlib.sha1(Path(caminho).read_bytes()).hexdigest()
+
+
+def hash_fontes(*objs, raiz: Path = None) -> str:
+    """Hash dos fontes (arquivos_fonte) de que os objetos dependem: muda com qualquer edição neles."""
+    h = hashlib.sha1()
+    for arq in arquivos_fonte(*objs, raiz=raiz):
+        st = arq.stat()
+        h.update(f"{arq.name}:{_hash_fonte(str(arq), st.st_mtime_ns, st.st_size)}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def caminho_cache(xlsx_path: Path, sheet_name, carregar, cache_dir: Path = CACHE_DIR):
+    xlsx_path = Path(xlsx_path).resolve()
+    st = xlsx_path.stat()
+    # identidade da função entra na chave: cada script gera colunas diferentes
+    origem = f"{Path(carregar.__code__.co_filename).stem}.{carregar.__qualname__}"
+    prefixo = f"{xlsx_path.stem}__{_hash(str(xlsx_path), sheet_name, origem)}"
+    # fontes também entram: se o carregar_df (ou algo que ele usa) mudar, o cache antigo é descartado
+    versao = _hash(st.st_mtime_ns, st.st_size, hash_fontes(carregar))
+    return Path(cache_dir) / f"{prefixo}__{versao}.parquet", prefixo
+
+
+def carregar_com_cache(carregar, xlsx_path: Path, sheet_name=None, cache_dir: Path = CACHE_DIR):
+    """Chama carregar(xlsx_path, sheet_name) usando o cache Parquet quando possível."""
+    if pyarrow is None or cache_dir is None:
+        return carregar(xlsx_path, sheet_name)
+
+    arq, prefixo = caminho_cache(xlsx_path, sheet_name, carregar, cache_dir)
+    if arq.exists():
+        try:
+            return pd.read_parquet(arq, memory_map=True)
+        except Exception as e:  # cache corrompido -> refaz
+            print(f"[cache] ignorando {arq.name}: {e}")
+
+    df = carregar(xlsx_path, sheet_name)
+
+    arq.parent.mkdir(parents=True, exist_ok=True)
+    # remove versões antigas da mesma planilha/aba
+    for antigo in arq.parent.glob(f"{prefixo}__*.parquet"):
+        if antigo != arq:
+            antigo.unlink(missing_ok=True)
+    tmp = arq.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, arq)
+    return df
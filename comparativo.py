@@ -3,35 +3,35 @@
 # Requisitos: pip install pandas matplotlib openpyxl
 
 from pathlib import Path
+import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from agregacao import agregar_cubo
+from cache_cubo import cubo_em_cache
+from cache_planilha import carregar_com_cache
+from exportacao import COMPRESSAO, FORMATO, exportar
+from instrumentacao import etapa, medir_figura
+import instrumentacao
+from normalizacao import (ANT_CONFIG_LIFETIME, ANTECEDENTES_VALIDOS, CONSEQ_ORDER, RegistroNormalizadores,
+                          norm_conseq)
+from ranking import CASAS_EMPATE, CHAVES_RANKING, ranquear
+from regras import montar_tabela, rotulos
+from renderizador import pyplot
 
 # ==================== CONFIGURE AQUI ====================
 XLSX_PATH = Path("CenarioApenasLifetime.xlsx")   # <-- seu XLSX
 OUT_DIR   = Path("GraficosGerados")              # <-- pasta saída
 TOPN      = 10                                                     # Top N por |Diff|
+CHAVE_RANKING = "abs"  # abs: |Diff| | rel: |Diff|/Daricélio | razao: max(Lift/Dar, Dar/Lift)
 SHEET_NAME = "Planilha1"  # ou 0; mantenha "Planilha1" se for o nome da aba
+EXPORTACAO = FORMATO      # parquet (particionado por antecedente) | csv
+COMPRESSAO_PARQUET = COMPRESSAO  # zstd | snappy | gzip | nenhuma
 # =======================================================
 
-ANTECEDENTES_VALIDOS = [
-    "changedFiles_D",
-    "commitsPull_D",
-    "requester_experience_project",
-    "total_lines_D",
-    "coreTeamFollowsRequester",
-    "first_Pull",
-    "followers_boolean",
-    "life_time",
-    "typeDeveloper",
-]
-
-def split_antecedente_valor(s: str):
-    s = str(s)
-    if "=" in s:
-        a, v = s.split("=", 1)
-        return a.strip(), v.strip()
-    return s.strip(), ""
+# normalização do cubo exportado (inclui life_time, antecedente deste cenário)
+NORMALIZADORES = RegistroNormalizadores(ANT_CONFIG_LIFETIME, norm_conseq, CONSEQ_ORDER)
+MEDIDAS_CUBO = ("Lift", "Daricelio")
 
 def carregar_df(xlsx_path: Path, sheet_name=None):
     raw = pd.read_excel(xlsx_path, sheet_name=sheet_name)
@@ -42,43 +42,31 @@ def carregar_df(xlsx_path: Path, sheet_name=None):
                 raw = v
                 break
 
-    # colunas da sua planilha
-    col_ante = "Antecendente"   # (assim mesmo, com 'c' extra)
-    col_cons = "Consequente"
-    col_lift = "Lift"
-    col_dari = "Daricelio"
-
-    # separa antecedente/valor
-    ants, vals = [], []
-    for s in raw[col_ante]:
-        a, v = split_antecedente_valor(s)
-        ants.append(a)
-        vals.append(v)
-
-    df = pd.DataFrame({
-        "Antecedente": ants,
-        "ValorAnt": vals,
-        "Consequente": raw[col_cons].astype(str),
-        "Lift": pd.to_numeric(raw[col_lift], errors="coerce"),
-        "Daricelio": pd.to_numeric(raw[col_dari], errors="coerce"),
-    }).dropna(subset=["Lift","Daricelio"], how="any").reset_index(drop=True)
-
-    # rótulo único
-    df["LabelFull"] = (
-        df["Antecedente"].str.strip() + " = " + df["ValorAnt"].str.strip()
-    ).str.strip() + " \u2192 " + df["Consequente"].str.strip()
-
-    df["Diff"] = df["Lift"] - df["Daricelio"]
-    df["AbsDiff"] = df["Diff"].abs()
-    return df
+    # colunas da sua planilha: "Antecendente" (assim mesmo, com 'c' extra),
+    # "Consequente", "Lift" e "Daricelio"; textos viram categorias, medidas float32
+    return montar_tabela(raw, {"Lift": "Lift", "Daricelio": "Daricelio"})
+
+def montar_cubo():
+    # médias por (Antecedente, ValCat, ConsCat); só roda sem cubo válido em .cache_cubos/
+    with etapa("carga"):
+        df = carregar_com_cache(carregar_df, XLSX_PATH, SHEET_NAME)
+    with etapa("agregacao"):
+        return agregar_cubo(NORMALIZADORES.normalizar_regras(df), medidas=MEDIDAS_CUBO)
+
+def consolidado(df):
+    # colunas derivadas só na exportação (a tabela em memória não guarda rótulos);
+    # Diff arredondado como no ranking, sem o ruído do float32 (0.119999945 -> 0.12)
+    diff = (df["Lift"].astype("float64") - df["Daricelio"].astype("float64")).round(CASAS_EMPATE)
+    return df.assign(LabelFull=rotulos(df), Diff=diff, AbsDiff=diff.abs())
 
 def plot_barras_duplas(sub, titulo, out_png):
+    plt = pyplot()  # matplotlib só é importado no primeiro gráfico
     x = np.arange(len(sub))
     width = 0.4
     plt.figure(figsize=(12,5))
     plt.bar(x - width/2, sub["Lift"], width=width, label="Lift")
     plt.bar(x + width/2, sub["Daricelio"], width=width, label="Daricélio")
-    plt.xticks(ticks=x, labels=sub["LabelFull"], rotation=45, ha="right")
+    plt.xticks(ticks=x, labels=rotulos(sub), rotation=45, ha="right")
     plt.title(titulo)
     plt.xlabel("Regra / Cenário")
     plt.ylabel("Valor")
@@ -87,32 +75,76 @@ def plot_barras_duplas(sub, titulo, out_png):
     plt.savefig(out_png, bbox_inches="tight")
     plt.close()
 
-def main():
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Top N regras por |Diff| de cada antecedente.")
+    ap.add_argument("--so-exportar", "--so-csv", dest="so_exportar", action="store_true",
+                    help="só grava a exportação consolidada, sem gráficos (não importa o matplotlib)")
+    ap.add_argument("--exportar", choices=["parquet", "csv"], default=EXPORTACAO,
+                    help="regras e cubo em Parquet particionado por antecedente, ou CSV (gravado em blocos)")
+    ap.add_argument("--compressao", choices=["zstd", "snappy", "gzip", "nenhuma"],
+                    default=COMPRESSAO_PARQUET, help="compressão do Parquet")
+    ap.add_argument("--topn", type=int, default=TOPN)
+    ap.add_argument("--chave", choices=sorted(CHAVES_RANKING), default=CHAVE_RANKING,
+                    help="critério de discrepância do ranking")
+    ap.add_argument("--geral", action="store_true",
+                    help="também gera o top N entre todos os antecedentes (grafico_TOP_geral.png)")
+    instrumentacao.argumentos(ap)
+    args = ap.parse_args(argv)
+    instrumentacao.iniciar_se_pedido(args, "comparativo.py")
+
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    df = carregar_df(XLSX_PATH, SHEET_NAME)
-    # salva CSV consolidado
-    df.to_csv(OUT_DIR / "comparativo_consolidado.csv", index=False)
+    with etapa("carga"):
+        df = carregar_com_cache(carregar_df, XLSX_PATH, SHEET_NAME)
+    # cubo do cache compartilhado (cache_cubo.py), como nos outros comparativos
+    with etapa("cubo"):
+        cubo = cubo_em_cache(montar_cubo, XLSX_PATH, SHEET_NAME, normalizadores=NORMALIZADORES,
+                             espec={"medidas": MEDIDAS_CUBO,
+                                    "funcoes": [montar_cubo, carregar_df, montar_tabela, agregar_cubo]})
+    # exportação consolidada: regras (+ rótulo/Diff) e médias por (Antecedente, ValCat, ConsCat)
+    with etapa("exportacao", linhas=len(df), formato=args.exportar):
+        exportados = [
+            exportar(df, OUT_DIR / "comparativo_consolidado", args.exportar, args.compressao,
+                     transformar=consolidado),
+            exportar(cubo.reset_index(), OUT_DIR / "comparativo_cubo", args.exportar, args.compressao),
+        ]
+    if args.so_exportar:
+        for p in exportados:
+            print("Exportado:", p)
+        instrumentacao.encerrar(OUT_DIR)
+        return
+
+    # opcional: restringir aos antecedentes válidos conhecidos
+    if ANTECEDENTES_VALIDOS:
+        df = df[df["Antecedente"].isin(ANTECEDENTES_VALIDOS)]
+
+    # top N de todos os antecedentes numa passada só (seleção parcial, sem ordenar tudo)
+    with etapa("ranking"):
+        ranking = ranquear(df, args.topn, args.chave)
+        grupos = dict(tuple(ranking.groupby("Antecedente", observed=True, sort=False)))
 
     gerados = []
-    # gera um gráfico por antecedente real presente na planilha
-    presentes = sorted(df["Antecedente"].dropna().unique().tolist(), key=str.lower)
-
-    for ant in presentes:
-        # opcional: restringir aos antecedentes válidos conhecidos
-        if ANTECEDENTES_VALIDOS and ant not in ANTECEDENTES_VALIDOS:
-            continue
-
-        sub = df[df["Antecedente"] == ant].sort_values("AbsDiff", ascending=False).head(TOPN)
-        if sub.empty:
-            continue
-        out_png = OUT_DIR / f"grafico_{ant}.png"
-        plot_barras_duplas(sub, f"Top {len(sub)} – Antecedente: {ant}", out_png)
-        gerados.append(out_png)
+    with etapa("render"):
+        # gera um gráfico por antecedente real presente na planilha
+        for ant in sorted(grupos, key=str.lower):
+            sub = grupos[ant]
+            out_png = OUT_DIR / f"grafico_{ant}.png"
+            with medir_figura(out_png):
+                plot_barras_duplas(sub, f"Top {len(sub)} – Antecedente: {ant}", out_png)
+            gerados.append(out_png)
+
+        if args.geral:
+            sub = ranquear(df, args.topn, args.chave, por=None)
+            out_png = OUT_DIR / "grafico_TOP_geral.png"
+            with medir_figura(out_png):
+                plot_barras_duplas(sub, f"Top {len(sub)} – Todos os antecedentes ({args.chave})", out_png)
+            gerados.append(out_png)
 
     print("Gráficos gerados:")
     for p in gerados:
         print(" -", p)
-    print("CSV consolidado:", OUT_DIR / "comparativo_consolidado.csv")
+    for p in exportados:
+        print("Exportado:", p)
+    instrumentacao.encerrar(OUT_DIR)
 
 if __name__ == "__main__":
     main()
@@ -1,221 +1,432 @@
 # -*- coding: utf-8 -*-
 # Gera, para cada ANTECEDENTE presente no XLSX, um gráfico por VALOR do antecedente,
 # comparando "Bases Python" (seu Lift) vs "Referência" (Daricélio).
+# Com --saida cubo: um único mapa de calor valor × consequente por antecedente.
 # Estilo limpo (fundo branco), rótulos, e organização em subpastas.
 #
 # Requisitos:
 #   pip install pandas matplotlib openpyxl
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import contextlib
+import os
+import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import re
 
+from cache_cubo import cubo_em_cache
+from cache_planilha import carregar_com_cache
+from cubo_mapeado import abrir_cubo, publicar_cubo
+from gravacao import MODOS as MODOS_GRAVACAO, EmMemoria, abrir_gravador, arquivo_zip
+from instrumentacao import etapa, figura
+import instrumentacao
+import renderizador
+from agregacao import AgregadorIncremental, agregar_cubo, fatia, matriz, niveis_presentes
+from leitura_streaming import COLUNAS_REGRAS, TAMANHO_BLOCO, iterar_blocos
+from manifesto import assinatura_estilo, comparar_manifesto, remover_orfaos, salvar_manifesto
+from normalizacao import ANT_CONFIG, CONSEQ_ORDER, RegistroNormalizadores, norm_conseq
+from renderizador import (ESTILO, PERFIS_SAIDA, RenderizadorBarras, RenderizadorCubo,
+                          renderizador_cubo, renderizador_padrao)
+from regras import montar_tabela
+from significancia import REAMOSTRAS, SEMENTE, intervalos_cubo
+
 # =================== CONFIGURE AQUI ===================
 XLSX_PATH = Path("CenarioApenasLifetime.xlsx")
 SHEET_NAME = "Planilha1"  # ou 0
 OUT_DIR = Path("GraficosGerados_TODOS")
+JOBS = 1  # processos de renderização (0 = todos os núcleos)
+SAIDA = "png"            # png (um por gráfico) | pdf (multipágina) | folha (grade) | cubo (mapa de calor)
+AGRUPAR = "antecedente"  # p/ pdf/folha: antecedente | execucao
+PERFIL = "publicacao"    # publicacao (300 dpi) | rascunho | esboco (rascunho sem rótulos)
+GRAVACAO = "direta"      # direta | lote (thread grava em lotes) | zip (um .zip da pasta de saída)
+INTERVALOS = False       # IC bootstrap por célula (barras de erro) e * onde p < ALFA
+ALFA = 0.05
+CACHE_CUBOS = Path(".cache_cubos")  # cubos agregados já prontos (None = desliga)
 # ======================================================
 
-# Ordem canônica dos consequentes (ajuste se necessário)
-CONSEQ_ORDER = ["very short", "short", "medium", "lengthy"]
-
-# Normalização dos consequentes -> very short / short / medium / lengthy
-def norm_conseq(c: str):
-    s = str(c).strip().lower()
-    if "very" in s and "short" in s: return "very short"
-    if "short" in s and "very" not in s: return "short"
-    if "medium" in s: return "medium"
-    if "length" in s or "long" in s: return "lengthy"
-    return s
-
-# Normalizações por antecedente e ordem desejada de valores
-def norm_lines(v: str):
-    s = str(v).strip().lower()
-    if "1" in s or s in {"one line","single line","1 line"}: return "1 line"
-    if "some" in s or "few" in s:                            return "some lines"
-    if "many" in s or "several" in s:                        return "many lines"
-    return v
-
-def norm_files(v: str):
-    s = str(v).strip().lower()
-    if "1" in s or "one" in s:   return "1 file"
-    if "some" in s or "few" in s:return "some files"
-    if "many" in s or "several" in s: return "many files"
-    return v
-
-def norm_commits(v: str):
-    s = str(v).strip().lower()
-    if "1" in s or "one" in s:     return "1 commit"
-    if "some" in s or "few" in s:  return "some commits"
-    if "many" in s or "several" in s: return "many commits"
-    return v
-
-def norm_bool(v: str):
-    s = str(v).strip().lower()
-    if s in {"true","yes","sim"}:  return "True"
-    if s in {"false","no","não","nao"}: return "False"
-    return v
-
-def norm_followers(v: str):
-    s = str(v).strip().lower()
-    if "no" in s and "follower" in s:  return "no followers"
-    if "has" in s or "sim" in s or "true" in s: return "has followers"
-    return v
-
-def norm_reqexp(v: str):
-    s = str(v).strip().lower()
-    if "no" in s: return "no contribution"
-    if "some" in s or "few" in s: return "some contributions"
-    if "many" in s or "several" in s: return "many contributions"
-    return v
-
-def norm_typedev(v: str):
-    s = str(v).strip().lower()
-    if s.startswith("core"):     return "core"
-    if s.startswith("extern"):   return "external"
-    return s or "(blank)"
-
-
-# Mapa de antecedentes conhecidos → (função de normalização, ordem de valores)
-ANT_CONFIG = {
-    "total_lines_D":                (norm_lines,    ["1 line", "some lines", "many lines"]),
-    "changedFiles_D":               (norm_files,    ["1 file", "some files", "many files"]),
-    "commitsPull_D":                (norm_commits,  ["1 commit", "some commits", "many commits"]),
-    "first_Pull":                   (norm_bool,     ["True", "False"]),
-    "coreTeamFollowsRequester":     (norm_bool,     ["True", "False"]),
-    "followers_boolean":            (norm_followers,["no followers", "has followers"]),
-    "typeDeveloper":                (norm_typedev, ["external", "core"]),
-    "requester_experience_project": (norm_reqexp,   ["no contribution", "some contributions", "many contributions"]),
-    # Se tiver outros, adicione aqui…
-}
-
-def split_antecedente_valor(s: str):
-    s = str(s)
-    if "=" in s:
-        a, v = s.split("=", 1)
-        return a.strip(), v.strip()
-    # fallback para formatos "ante_valor" (menos comum na sua base)
-    if "_" in s:
-        a, v = s.split("_", 1)
-        return a.strip(), v.replace("_", " ").strip()
-    return s.strip(), ""
+# Ordem dos consequentes, norm_* e ANT_CONFIG ficam em normalizacao.py (compartilhados
+# com o comparativo.py); ajuste lá.
+
+NORMALIZADORES = RegistroNormalizadores(ANT_CONFIG, norm_conseq, CONSEQ_ORDER)
 
 def carregar_df(xlsx_path: Path, sheet_name=None):
-    raw = pd.read_excel(xlsx_path, sheet_name=sheet_name)
+    with etapa("read_excel"):
+        raw = pd.read_excel(xlsx_path, sheet_name=sheet_name)
     if isinstance(raw, dict):
         for k,v in raw.items():
             if isinstance(v, pd.DataFrame) and len(v)>0:
                 raw = v; break
-    col_ante = "Antecendente"  # (grafia do arquivo)
-    col_cons = "Consequente"
-    ants, vals = [], []
-    for s in raw[col_ante]:
-        a, v = split_antecedente_valor(s)
-        ants.append(a)
-        vals.append(v)
-    df = pd.DataFrame({
-        "Antecedente": ants,
-        "ValorAnt": vals,
-        "Consequente": raw[col_cons].astype(str),
-        "BasesPython": pd.to_numeric(raw["Lift"], errors="coerce"),
-        "Referencia":  pd.to_numeric(raw["Daricelio"], errors="coerce"),
-    }).dropna(subset=["BasesPython","Referencia"], how="any").reset_index(drop=True)
-    return df
-
-def plot_par_barras(x, y1, y2, labels, title, out_png):
-    # Estilo limpo
-    plt.style.use("default")
-    plt.rcParams.update({
-        "font.family": "Arial",
-        "axes.edgecolor": "black",
-        "axes.linewidth": 1.0,
-        "axes.titlesize": 13,
-        "axes.labelsize": 11,
-        "legend.fontsize": 10,
-        "figure.facecolor": "white"
-    })
-
-    width = 0.35
-    plt.figure(figsize=(8.5, 4.5))
-    bars1 = plt.bar(x - width/2, y1, width=width, label="Bases Python", color="#4C72B0")
-    bars2 = plt.bar(x + width/2, y2, width=width, label="Referência",  color="#8C8C8C")
-
-    # Rótulos numéricos
-    for bars in (bars1, bars2):
-        for bar in bars:
-            yval = bar.get_height()
-            plt.text(bar.get_x()+bar.get_width()/2, yval+0.02, f"{yval:.2f}",
-                     ha="center", va="bottom", fontsize=9, color="#333333")
-
-    plt.xticks(x, labels)
-    plt.xlabel("Consequente")
-    plt.ylabel("Lift")
-    plt.title(title, pad=20)
-    plt.legend(frameon=False)
-    ymax = max(np.nanmax(y1), np.nanmax(y2))
-    plt.ylim(0, ymax*1.2 if np.isfinite(ymax) else 1)
-    plt.subplots_adjust(top=0.88, bottom=0.15, left=0.12, right=0.95)
-    plt.savefig(out_png, bbox_inches="tight", dpi=300)
-    plt.close()
-
-def gerar_todos(df, out_dir: Path):
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    # Normaliza consequentes
-    df = df.copy()
-    df["ConsCat"] = df["Consequente"].apply(norm_conseq)
-
-    antecedentes = sorted(df["Antecedente"].dropna().unique().tolist(), key=str.lower)
-    print("Antecedentes encontrados:", antecedentes)
-
+    if "Daricelio" not in raw:
+        raise ValueError(f"{xlsx_path}: sem a coluna Daricelio (referência do comparativo)")
+    _exigir_referencia(xlsx_path, len(raw), int(raw["Daricelio"].notna().sum()))
+    with etapa("montar_regras", linhas=len(raw)):
+        return montar_regras(raw)
+
+def _exigir_referencia(caminho, linhas: int, com_referencia: int):
+    # ex.: saída do mineracao.py sem --referencia: Daricelio existe mas está toda vazia
+    if linhas and not com_referencia:
+        raise ValueError(f"{caminho}: coluna Daricelio vazia em todas as {linhas} regras; sem "
+                         "a referência não há comparação (gere com mineracao.py --referencia <planilha>)")
+
+def montar_regras(raw):
+    # recebe as colunas do XLSX (inteiro ou um bloco do streaming); "Antecendente"
+    # é a grafia do arquivo e o fallback "ante_valor" (sublinhado) vale aqui
+    return montar_tabela(raw, {"Lift": "BasesPython", "Daricelio": "Referencia"}, sublinhado=True)
+
+def plot_par_barras(x, y1, y2, labels, title, out_png, perfil: str = "publicacao"):
+    # figura/artistas montados uma vez por processo; só os dados mudam.
+    # y1/y2 3×n (média, inf, sup) -> barras de erro com o IC de cada célula
+    renderizador_padrao(perfil).desenhar(x, y1, y2, labels, title, out_png)
+
+def normalizar_regras(df):
+    return NORMALIZADORES.normalizar_regras(df)
+
+def montar_cubo(df, intervalos: bool = False, jobs: int = 1, reamostras: int = REAMOSTRAS,
+                semente: int = SEMENTE):
+    """Normaliza e agrega todas as células (Antecedente, ValCat, ConsCat) num único groupby.
+
+    Com intervalos=True o cubo ganha, por célula, o IC bootstrap de cada medida
+    e o p-valor da diferença (ver significancia.intervalos_cubo).
+    """
+    with etapa("normalizacao", linhas=len(df)):
+        df = normalizar_regras(df)
+    with etapa("agregacao"):
+        cubo = agregar_cubo(df)
+    if intervalos:
+        with etapa("intervalos", reamostras=reamostras):
+            cubo = cubo.join(intervalos_cubo(df, reamostras=reamostras, semente=semente, jobs=jobs))
+    return cubo
+
+def montar_cubo_streaming(caminho: Path, sheet_name=None, tamanho_bloco: int = TAMANHO_BLOCO):
+    """Mesmo cubo do montar_cubo, lendo o XLSX (openpyxl read-only) ou CSV em blocos."""
+    agregador = AgregadorIncremental()
+    linhas = com_referencia = 0
+    for raw in iterar_blocos(caminho, sheet_name, COLUNAS_REGRAS, tamanho_bloco):
+        linhas += len(raw)
+        com_referencia += int(pd.to_numeric(raw["Daricelio"], errors="coerce").notna().sum())
+        agregador.adicionar(normalizar_regras(montar_regras(raw)))
+    _exigir_referencia(caminho, linhas, com_referencia)
+    print(f"Lidas {agregador.linhas} regras válidas de {caminho} (streaming)")
+    return agregador.cubo()
+
+def ordens(bloco, ant):
+    """(valores, consequentes) de um antecedente do cubo, na ordem dos gráficos."""
+    observados = niveis_presentes(bloco)
+    conseqs = niveis_presentes(bloco, nivel=1)
+
+    # Ordem dos VALORES conforme antecedente (ANT_CONFIG; senão, alfabética)
+    value_order = NORMALIZADORES.ordem_configurada(ant) or sorted(map(str, observados))
+
+    # Ordem de consequentes (usa canônica; se não houver, usa únicos)
+    conseq_order = CONSEQ_ORDER if any(c in CONSEQ_ORDER for c in conseqs) else \
+                   sorted(map(str, conseqs))
+
+    values_present = [v for v in value_order if v in observados]
+    if not values_present:
+        values_present = sorted(map(str, observados))
+    return values_present, conseq_order
+
+def percorrer_cubo(cubo, out_dir: Path, saida: str = "png", verboso: bool = True):
+    """(antecedente, bloco, valor, consequentes, out_png) de cada gráfico, na ordem dos arquivos.
+
+    bloco = cubo.loc[antecedente]. Com saida="cubo" o valor é a lista de
+    valores do antecedente (um mapa de calor por antecedente).
+    """
+    antecedentes = sorted(niveis_presentes(cubo), key=str.lower)
+    if verboso:
+        print("Antecedentes encontrados:", antecedentes)
     for ant in antecedentes:
-        sub = df[df["Antecedente"] == ant].copy()
-        if sub.empty:
+        # Gera um gráfico por VALOR presente (ou um mapa de calor com todos)
+        bloco = cubo.loc[ant]  # (ValCat, ConsCat) -> médias
+        values_present, conseq_order = ordens(bloco, ant)
+        if verboso:
+            print(f"\n[{ant}] valores: {values_present}")
+        ant_dir = out_dir / ant
+        if saida == "cubo":
+            yield ant, bloco, values_present, conseq_order, ant_dir / f"{ant}__cubo.png"
             continue
+        for val in values_present:
+            fname = f"{ant}__{re.sub(r'[^A-Za-z0-9_]+','_', str(val))}.png"
+            yield ant, bloco, val, conseq_order, ant_dir / fname
+
+def grafico_barras(agg, ant, val, conseq_order, out_png):
+    """(x, y1, y2, labels, title, out_png) de um valor; agg = consequente × medidas do cubo."""
+    xs = np.arange(len(conseq_order))
+    title = f"{ant.replace('_',' ')} — {val}"
+    y1, y2, labels = agg["BasesPython"].values, agg["Referencia"].values, conseq_order
+    if "p_valor" in agg.columns:
+        # 3×n (média, inf, sup): o renderizador desenha as barras de erro
+        y1 = agg[["BasesPython", "BasesPython_inf", "BasesPython_sup"]].to_numpy().T
+        y2 = agg[["Referencia", "Referencia_inf", "Referencia_sup"]].to_numpy().T
+        labels = [f"{c} *" if p < ALFA else c for c, p in zip(conseq_order, agg["p_valor"])]
+        if labels != conseq_order:
+            title += f"  (* p < {ALFA:g})"
+    return xs, y1, y2, labels, title, out_png
+
+def preparar_graficos(cubo, out_dir: Path):
+    """Lê do cubo cada (antecedente, valor) e devolve a lista de gráficos a desenhar."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # médias por consequente, na ordem do eixo X (NaN se a célula não tem regra)
+    return [grafico_barras(fatia(bloco, val, conseq_order), ant, val, conseq_order, out_png)
+            for ant, bloco, val, conseq_order, out_png in percorrer_cubo(cubo, out_dir)]
 
-        # Decide normalização dos VALORES conforme antecedente
-        norm_fun, value_order = ANT_CONFIG.get(ant, (lambda x: x, sorted(sub["ValorAnt"].astype(str).unique().tolist())))
-        sub["ValCat"] = sub["ValorAnt"].apply(norm_fun)
-
-        # Ordem de consequentes (usa canônica; se não houver, usa únicos)
-        conseq_order = CONSEQ_ORDER if sub["ConsCat"].isin(CONSEQ_ORDER).any() else \
-                       sorted(sub["ConsCat"].astype(str).unique().tolist())
-
-        # Gera um gráfico por VALOR presente
-        values_present = [v for v in value_order if v in sub["ValCat"].unique()]
-        if not values_present:
-            values_present = sorted(sub["ValCat"].astype(str).unique().tolist())
-
-        ant_dir = out_dir / ant
-        ant_dir.mkdir(parents=True, exist_ok=True)
+def preparar_cubos(cubo, out_dir: Path):
+    """Um mapa de calor por antecedente: a matriz valor × consequente inteira.
 
-        print(f"\n[{ant}] valores: {values_present}")
-        for val in values_present:
-            g = sub[sub["ValCat"] == val].copy()
-            if g.empty:
-                continue
-
-            # agrega por consequente (média) — caso haja múltiplas regras por mesma célula
-            agg = g.groupby("ConsCat", as_index=False).agg(
-                BasesPython=("BasesPython","mean"),
-                Referencia=("Referencia","mean")
-            )
-            # garante ordem no eixo X
-            agg["ConsCat"] = pd.Categorical(agg["ConsCat"], categories=conseq_order, ordered=True)
-            agg = agg.sort_values("ConsCat")
-            xs = np.arange(len(conseq_order))
+    Devolve (valores, consequentes, bases, referência, title, out_png), com as
+    matrizes na ordem do ANT_CONFIG / CONSEQ_ORDER (NaN onde não há regra).
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-            fname = f"{ant}__{re.sub(r'[^A-Za-z0-9_]+','_', str(val))}.png"
-            out_png = ant_dir / fname
-            title = f"{ant.replace('_',' ')} — {val}"
-            plot_par_barras(xs, agg["BasesPython"].values, agg["Referencia"].values, conseq_order, title, out_png)
-            print(" - Gerado:", out_png)
-
-def main():
-    df = carregar_df(XLSX_PATH, SHEET_NAME)
-    gerar_todos(df, OUT_DIR)
+    graficos = []
+    for ant, bloco, values_present, conseq_order, out_png in percorrer_cubo(cubo, out_dir, "cubo"):
+        bases, ref = (matriz(bloco, m, values_present, conseq_order).to_numpy(dtype=float)
+                      for m in ("BasesPython", "Referencia"))
+        graficos.append(grafico_cubo(ant, values_present, conseq_order, bases, ref, out_png))
+    return graficos
+
+def grafico_cubo(ant, valores, conseqs, bases, ref, out_png):
+    return valores, conseqs, bases, ref, ant.replace("_", " "), out_png
+
+def agrupar_saidas(graficos, out_dir: Path, saida: str = "png", agrupar: str = "antecedente"):
+    """Decide em que arquivo cada gráfico vai parar: lista de (destino, gráficos, título).
+
+    saida="png": um PNG por gráfico (padrão); "pdf": um PDF com uma página por
+    gráfico; "folha": uma única figura em grade. Nos dois últimos, agrupar diz se
+    há um arquivo por antecedente ou um só para a execução inteira. "cubo": um
+    PNG (mapa de calor) por antecedente, vindo do preparar_cubos.
+    """
+    if saida in ("png", "cubo"):
+        return [(g[-1], [g], None) for g in graficos]
+    sufixo = ".pdf" if saida == "pdf" else "__folha.png"
+    grupos = {}
+    for g in graficos:
+        if agrupar == "execucao":
+            destino, titulo = out_dir / f"todos{sufixo}", None
+        else:
+            ant = g[-1].parent.name
+            destino, titulo = out_dir / ant / f"{ant}{sufixo}", ant.replace("_", " ")
+        grupos.setdefault(destino, (destino, [], titulo))[1].append(g)
+    return list(grupos.values())
+
+def _iniciar_worker():
+    # workers não têm tela: se algo importar o pyplot lá, que já venha com o Agg
+    # (sem importar o matplotlib agora: worker que só carrega planilha não paga por ele)
+    os.environ["MPLBACKEND"] = "Agg"
+
+def _renderizar(tarefa, em_memoria: bool = False):
+    # devolve (destino, tempos, conteúdo): os tempos voltam do worker para o --profile;
+    # em_memoria=True não toca no disco e o conteúdo são os bytes do arquivo (senão None)
+    (destino, graficos, titulo), saida, perfil = tarefa
+    t0 = time.perf_counter()
+    if em_memoria:
+        alvo = EmMemoria(destino)
+    else:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        alvo = destino
+    tempos = {}
+    if saida == "png":
+        plot_par_barras(*graficos[0][:-1], alvo, perfil=perfil)
+        tempos.update(renderizador_padrao(perfil).ultimo_tempo)
+    elif saida == "cubo":
+        renderizador_cubo(perfil).desenhar(*graficos[0][:-1], alvo)
+        tempos.update(renderizador_cubo(perfil).ultimo_tempo)
+    elif saida == "pdf":
+        renderizador_padrao(perfil).desenhar_pdf([g[:-1] for g in graficos], alvo)
+    else:
+        renderizador_padrao(perfil).desenhar_folha([g[:-1] for g in graficos], alvo, titulo)
+    tempos["graficos"] = len(graficos)
+    tempos["pid"] = os.getpid()
+    return destino, {"tempo_s": time.perf_counter() - t0, **tempos}, \
+        alvo.getvalue() if em_memoria else None
+
+def _renderizar_mapeado(tarefa, em_memoria: bool = False):
+    # no worker: recorta os gráficos do cubo mapeado pelos códigos e desenha como o _renderizar
+    (destino, refs, titulo), saida, perfil, pasta = tarefa
+    mapeado = abrir_cubo(pasta)
+    graficos = []
+    for par, i_cons, out_png in refs:
+        conseqs = mapeado.consequentes(i_cons)
+        if saida == "cubo":
+            ant = mapeado.nomes_par(par[0])[0]
+            valores = [mapeado.nomes_par(p)[1] for p in par]
+            bases, ref = (mapeado.matriz(par, i_cons, m) for m in ("BasesPython", "Referencia"))
+            graficos.append(grafico_cubo(ant, valores, conseqs, bases, ref, out_png))
+        else:
+            ant, val = mapeado.nomes_par(par)
+            graficos.append(grafico_barras(mapeado.fatia(par, i_cons), ant, val, conseqs, out_png))
+    return _renderizar(((destino, graficos, titulo), saida, perfil), em_memoria)
+
+def tarefas_render(saidas, saida: str = "png", perfil: str = "publicacao"):
+    # cada tarefa é picklável: vai direto para um worker do pool
+    return [(s, saida, perfil) for s in saidas]
+
+def tarefas_mapeadas(saidas, cubo, mapeado, saida: str = "png", perfil: str = "publicacao"):
+    """Como tarefas_render, mas para o _renderizar_mapeado: cada gráfico vai como
+    (código do par, códigos dos consequentes, out_png) no cubo mapeado, sem os dados."""
+    coordenadas = {out_png: (ant, val, conseqs) for ant, _, val, conseqs, out_png
+                   in percorrer_cubo(cubo, Path(), saida, verboso=False)}
+    tarefas = []
+    for destino, graficos, titulo in saidas:
+        refs = [(*mapeado.codigos(*coordenadas[Path(*g[-1].parts[-2:])]), g[-1]) for g in graficos]
+        tarefas.append(((destino, refs, titulo), saida, perfil, str(mapeado.pasta)))
+    return tarefas
+
+def renderizar_graficos(saidas, jobs: int = 1, saida: str = "png", perfil: str = "publicacao",
+                        cubo=None, em_memoria: bool = False):
+    """Desenha as saídas em série (jobs=1) ou num pool de processos, sempre na mesma ordem.
+
+    No pool, com o cubo, os workers leem os dados do cubo mapeado em memória
+    (cubo_mapeado.py) em vez de recebê-los em cada tarefa.
+    Gera (destino, tempos, conteúdo) de cada arquivo; com em_memoria=True nada
+    é gravado e o conteúdo são os bytes (ver gravacao.py).
+    """
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(saidas) <= 1:
+        for tarefa in tarefas_render(saidas, saida, perfil):
+            yield _renderizar(tarefa, em_memoria)
+        return
+    with contextlib.ExitStack() as pilha:
+        if cubo is None:
+            funcao, tarefas = _renderizar, tarefas_render(saidas, saida, perfil)
+        else:
+            mapeado = pilha.enter_context(publicar_cubo(cubo, CONSEQ_ORDER))
+            funcao, tarefas = _renderizar_mapeado, tarefas_mapeadas(saidas, cubo, mapeado, saida, perfil)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tarefas)), initializer=_iniciar_worker) as pool:
+            # map devolve na ordem de entrada, independente de quem terminar primeiro
+            yield from pool.map(partial(funcao, em_memoria=em_memoria), tarefas)
+
+def planejar_saidas(cubo, out_dir: Path, forcar: bool = False, saida: str = "png",
+                    agrupar: str = "antecedente", perfil: str = "publicacao"):
+    """Monta os gráficos do cubo e consulta o manifesto.
+
+    Devolve (saidas, pendentes, entradas, orfaos) — ver manifesto.comparar_manifesto.
+    """
+    with etapa("preparar_graficos"):
+        graficos = (preparar_cubos if saida == "cubo" else preparar_graficos)(cubo, out_dir)
+        saidas = agrupar_saidas(graficos, out_dir, saida, agrupar)
+
+    # Só redesenha o que mudou desde a última execução (manifesto na pasta de saída)
+    with etapa("manifesto"):
+        assinatura = assinatura_estilo(plot_par_barras, RenderizadorBarras, RenderizadorCubo,
+                                        fontes=(renderizador,), estilo=ESTILO,
+                                        perfil=PERFIS_SAIDA[perfil], saida=saida)
+        pendentes, entradas, orfaos = comparar_manifesto(saidas, out_dir, assinatura, forcar=forcar)
+    return saidas, pendentes, entradas, orfaos
+
+def gerar_todos(df, out_dir: Path, **opcoes):
+    return gerar_do_cubo(montar_cubo(df), out_dir, **opcoes)
+
+def gerar_do_cubo(cubo, out_dir: Path, jobs: int = 1, forcar: bool = False,
+                  saida: str = "png", agrupar: str = "antecedente", perfil: str = "publicacao",
+                  gravacao: str = "direta"):
+    # zip: o arquivo sai sempre completo (tudo redesenhado); pasta e manifesto ficam como estão
+    em_zip = gravacao == "zip"
+    saidas, pendentes, entradas, orfaos = planejar_saidas(cubo, out_dir, forcar or em_zip,
+                                                          saida, agrupar, perfil)
+    if em_zip:
+        orfaos = []
+    remover_orfaos(orfaos)
+    for arq in orfaos:
+        print(" - Removido (órfão):", arq)
+
+    print(f"\nRenderizando {len(pendentes)} arquivos (jobs={jobs}, saída={saida}, perfil={perfil}, "
+          f"gravação={gravacao}); {len(saidas) - len(pendentes)} sem mudança, pulados")
+    gravador = abrir_gravador(gravacao, out_dir)
+    with gravador or contextlib.nullcontext():
+        with etapa("render", arquivos=len(pendentes), jobs=jobs):
+            for destino, tempos, conteudo in renderizar_graficos(pendentes, jobs, saida, perfil, cubo,
+                                                                  em_memoria=gravador is not None):
+                if gravador is not None:
+                    gravador.gravar(destino, conteudo)
+                print(" - Gerado:", destino)
+                figura(destino, **tempos)
+        if gravador is not None:
+            with etapa("gravacao", arquivos=len(pendentes)):
+                gravador.fechar()  # espera o que ainda está na fila
+    if em_zip:
+        print("Arquivo:", arquivo_zip(out_dir))
+    else:
+        salvar_manifesto(out_dir, entradas)
+    return {"arquivos": len(saidas), "gerados": len(pendentes),
+            "pulados": len(saidas) - len(pendentes), "removidos": len(orfaos)}
+
+def carregar_cubo(caminho: Path, sheet_name=None, streaming: bool = False,
+                  intervalos: bool = False, jobs: int = 1, cache_dir=CACHE_CUBOS):
+    """Cubo de uma planilha: do cache de cubos (cache_cubo.py) ou, se não houver,
+    via cache Parquet das regras ou, em streaming/CSV, lendo em blocos."""
+    streaming = streaming or Path(caminho).suffix.lower() == ".csv"
+    if streaming and intervalos:
+        # o bootstrap reamostra as regras de cada célula: precisa delas em memória
+        raise ValueError("intervalos não funcionam em streaming (CSV ou --streaming)")
+
+    def calcular():
+        if streaming:
+            with etapa("streaming"):
+                return montar_cubo_streaming(caminho, sheet_name)
+        with etapa("carga"):
+            df = carregar_com_cache(carregar_df, caminho, sheet_name)
+        return montar_cubo(df, intervalos, jobs)
+
+    # o que muda o cubo: leitura, normalização, agregação (e o bootstrap, se houver);
+    # o código de tudo que o calcular chama entra na chave pelos fontes (cache_cubo)
+    espec = {"streaming": streaming,
+             "funcoes": [carregar_df, montar_regras, montar_tabela, normalizar_regras, agregar_cubo],
+             "intervalos": [intervalos_cubo, REAMOSTRAS, SEMENTE] if intervalos else None}
+    with etapa("cubo"):
+        return cubo_em_cache(calcular, caminho, sheet_name, NORMALIZADORES, espec, cache_dir)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Gera um gráfico por valor de cada antecedente do XLSX.")
+    ap.add_argument("--jobs", type=int, default=JOBS,
+                    help="processos para renderizar (1 = serial, 0 = todos os núcleos)")
+    ap.add_argument("--forcar", action="store_true",
+                    help="redesenha todos os gráficos, ignorando o manifesto")
+    ap.add_argument("--saida", choices=["png", "pdf", "folha", "cubo"], default=SAIDA,
+                    help="png: um arquivo por gráfico; pdf: PDF multipágina; folha: grade numa só figura; "
+                         "cubo: um mapa de calor valor × consequente por antecedente")
+    ap.add_argument("--agrupar", choices=["antecedente", "execucao"], default=AGRUPAR,
+                    help="com --saida pdf/folha: um arquivo por antecedente ou um só para tudo")
+    ap.add_argument("--perfil", choices=sorted(PERFIS_SAIDA), default=PERFIL,
+                    help="rascunho (100 dpi, PNG pouco comprimido), esboco (rascunho sem os "
+                         "números nas barras) ou publicacao (300 dpi)")
+    ap.add_argument("--gravacao", choices=list(MODOS_GRAVACAO), default=GRAVACAO,
+                    help="direta: cada render grava o seu arquivo; lote: render em memória e uma "
+                         "thread grava em lotes; zip: tudo num único "
+                         f"{arquivo_zip(OUT_DIR).name} (sempre completo, sem manifesto)")
+    ap.add_argument("--entrada", type=Path, default=XLSX_PATH,
+                    help="XLSX ou CSV com as regras (CSV é sempre lido em streaming)")
+    ap.add_argument("--aba", default=SHEET_NAME, help="aba do XLSX")
+    ap.add_argument("--streaming", action="store_true",
+                    help="lê o XLSX em blocos (openpyxl read-only) e agrega incrementalmente")
+    ap.add_argument("--intervalos", action="store_true", default=INTERVALOS,
+                    help="IC bootstrap por célula como barras de erro (* = p < ALFA na permutação)")
+    instrumentacao.argumentos(ap)
+    ap.add_argument("--sem-cache-cubo", action="store_true",
+                    help=f"não usa o cache de cubos agregados ({CACHE_CUBOS}/)")
+    ap.add_argument("--so-cache", action="store_true",
+                    help="só gera o cache Parquet da planilha (não importa o matplotlib)")
+    args = ap.parse_args(argv)
+    instrumentacao.iniciar_se_pedido(args, "comparativo4.py")
+
+    if args.so_cache:
+        df = carregar_com_cache(carregar_df, args.entrada, args.aba)
+        print(f"Cache pronto: {len(df)} regras de {args.entrada}")
+        instrumentacao.encerrar(OUT_DIR)
+        return
+    if args.intervalos and (args.streaming or args.entrada.suffix.lower() == ".csv"):
+        ap.error("--intervalos precisa das regras em memória (sem --streaming nem CSV)")
+    cubo = carregar_cubo(args.entrada, args.aba, args.streaming, args.intervalos, args.jobs,
+                         cache_dir=None if args.sem_cache_cubo else CACHE_CUBOS)
+    gerar_do_cubo(cubo, OUT_DIR, jobs=args.jobs, forcar=args.forcar,
+                  saida=args.saida, agrupar=args.agrupar, perfil=args.perfil, gravacao=args.gravacao)
+    for arq in instrumentacao.encerrar(OUT_DIR):
+        print("Perfil:", arq)
     print("\nConcluído. Verifique a pasta:", OUT_DIR)
 
 if __name__ == "__main__":
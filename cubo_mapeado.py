@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Cubo agregado num .npy mapeado em memória, para os workers de render.
+#
+# Em vez de cada tarefa do pool levar (pickle) os vetores/matrizes do seu
+# gráfico, o processo principal grava o cubo uma vez numa pasta temporária:
+#
+#   cubo.npy     float64, pares (antecedente, valor) × consequente × medida
+#                (NaN onde não há regra)
+#   indice.json  nomes de cada nível (códigos = posição na lista), as
+#                medidas e o par (código do antecedente, código do valor)
+#                de cada linha
+#
+# Os workers abrem o arquivo com mmap_mode="r" (uma vez por processo: as
+# páginas vêm do cache do sistema, sem cópia) e recortam o gráfico pelos
+# códigos; a tarefa leva só alguns inteiros, qualquer que seja o cenário.
+#
+# Só os pares (antecedente, valor) que existem no cubo viram linha: o
+# tamanho é o do cubo, não o produto de todos os níveis.
+#
+# Requisitos: pip install numpy pandas
+
+from pathlib import Path
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# =================== CONFIGURE AQUI ===================
+PASTA = None  # onde criar os cubos mapeados (None = pasta temporária do sistema; ex.: /dev/shm)
+# ======================================================
+
+ARQUIVO_DADOS = "cubo.npy"
+ARQUIVO_INDICE = "indice.json"
+ABERTOS_MAX = 8  # cubos mapeados mantidos abertos por worker
+
+_abertos = {}  # pasta -> CuboMapeado, do menos para o mais recente
+
+
+class CuboMapeado:
+    """Leitura de um cubo publicado (ver publicar_cubo).
+
+    No processo principal, `with publicar_cubo(...) as mapeado:` apaga a
+    pasta no fim; nos workers use abrir_cubo(pasta), que nunca apaga.
+    """
+
+    def __init__(self, pasta: Path):
+        self.pasta = Path(pasta)
+        self.dados = np.load(self.pasta / ARQUIVO_DADOS, mmap_mode="r")
+        indice = json.loads((self.pasta / ARQUIVO_INDICE).read_text(encoding="utf-8"))
+        self.niveis = indice["niveis"]
+        self.medidas = indice["medidas"]
+        self.pares = indice["pares"]
+        self._codigos = None
+
+    def codigos(self, ant, valores, conseqs):
+        """(código do par ou tupla de códigos, tupla de códigos dos consequentes) — lado do principal."""
+        if self._codigos is None:
+            self._codigos = ({tuple(self.nomes_par(i)): i for i in range(len(self.pares))},
+                             {c: i for i, c in enumerate(self.niveis[2])})
+        pares, cons = self._codigos
+        if isinstance(valores, (list, tuple)):
+            par = tuple(pares[(ant, v)] for v in valores)
+        else:
+            par = pares[(ant, valores)]
+        return par, tuple(cons[c] for c in conseqs)
+
+    def nomes_par(self, par: int):
+        i_ant, i_val = self.pares[par]
+        return self.niveis[0][i_ant], self.niveis[1][i_val]
+
+    def consequentes(self, i_cons):
+        return [self.niveis[2][i] for i in i_cons]
+
+    def fatia(self, par: int, i_cons) -> pd.DataFrame:
+        """Consequente × medida de um par, como agregacao.fatia (NaN onde não há regra)."""
+        return pd.DataFrame(np.array(self.dados[par, list(i_cons)]), index=self.consequentes(i_cons),
+                            columns=self.medidas)
+
+    def matriz(self, pares, i_cons, medida: str) -> np.ndarray:
+        """Valor × consequente de uma medida, como agregacao.matriz."""
+        return np.array(self.dados[np.ix_(list(pares), list(i_cons), [self.medidas.index(medida)])][..., 0])
+
+    def fechar(self):
+        self.dados = None
+        # no Windows o arquivo ainda mapeado num worker não sai: fica na pasta temporária
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def publicar_cubo(cubo: pd.DataFrame, consequentes=(), pasta=PASTA) -> CuboMapeado:
+    """Grava o cubo (índice Antecedente, ValCat, ConsCat) para os workers abrirem.
+
+    consequentes: nomes que os gráficos podem pedir mesmo sem regra no cubo
+    (ex.: CONSEQ_ORDER); entram no nível com a coluna toda NaN.
+    """
+    niveis = [[str(v) for v in nivel] for nivel in cubo.index.levels]
+    niveis[2] += [c for c in consequentes if c not in set(niveis[2])]
+    cod_ant, cod_val, cod_cons = (np.asarray(c, dtype=np.int64) for c in cubo.index.codes)
+    pares, linha = np.unique(cod_ant * len(niveis[1]) + cod_val, return_inverse=True)
+
+    destino = Path(tempfile.mkdtemp(prefix="cubo_", dir=pasta))
+    dados = np.lib.format.open_memmap(destino / ARQUIVO_DADOS, mode="w+", dtype=np.float64,
+                                      shape=(len(pares), len(niveis[2]), len(cubo.columns)))
+    dados[:] = np.nan
+    dados[linha, cod_cons] = cubo.to_numpy(dtype=np.float64)
+    dados.flush()
+    del dados
+    indice = {"niveis": niveis, "medidas": [str(c) for c in cubo.columns],
+              "pares": np.column_stack(np.divmod(pares, len(niveis[1]))).tolist()}
+    (destino / ARQUIVO_INDICE).write_text(json.dumps(indice, ensure_ascii=False), encoding="utf-8")
+    return CuboMapeado(destino)
+
+
+def abrir_cubo(pasta: str) -> CuboMapeado:
+    """Cubo mapeado de uma pasta, aberto uma vez por processo (worker).
+
+    Guarda até ABERTOS_MAX cubos (lote: vários cenários no mesmo pool) e solta
+    os de pastas que já foram apagadas: num pool que vive entre execuções
+    (observador) o mapeamento de um cubo antigo não segura o arquivo apagado.
+    """
+    cubo = _abertos.pop(pasta, None)
+    for antiga in [p for p in _abertos if not os.path.isdir(p)]:
+        del _abertos[antiga]
+    if cubo is None:
+        cubo = CuboMapeado(pasta)
+    _abertos[pasta] = cubo  # mais recente no fim
+    while len(_abertos) > ABERTOS_MAX:
+        del _abertos[next(iter(_abertos))]
+    return cubo
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Exportação consolidada das regras e do cubo agregado.
+#
+# Parquet particionado por antecedente (uma pasta Antecedente=<nome>/ por
+# antecedente, compressão zstd por padrão): quem lê depois carrega só o
+# antecedente que precisa, sem varrer a exportação inteira:
+#
+#   pd.read_parquet("GraficosGerados/comparativo_consolidado",
+#                   filters=[("Antecedente", "==", "life_time")])
+#   # ou: ler_antecedente("GraficosGerados/comparativo_consolidado", "life_time")
+#
+# Sem pyarrow (ou com formato="csv"), grava CSV em blocos: cada bloco passa
+# pelo `transformar` (ex.: colunas derivadas) e vai direto para o arquivo, sem
+# montar o DataFrame derivado inteiro em memória.
+#
+# Requisitos: pip install pandas pyarrow  (sem pyarrow, só CSV)
+
+from pathlib import Path
+import os
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # sem pyarrow: exporta CSV
+    pyarrow = None
+
+FORMATO = "parquet"   # parquet | csv
+COMPRESSAO = "zstd"   # zstd | snappy | gzip | nenhuma
+PARTICAO = "Antecedente"
+TAMANHO_BLOCO = 50_000  # linhas por bloco no CSV
+
+
+def _sem_transformar(df):
+    return df
+
+
+def exportar_parquet(df: pd.DataFrame, destino: Path, por: str = PARTICAO,
+                     compressao: str = COMPRESSAO, transformar=_sem_transformar) -> Path:
+    """Grava df como dataset Parquet particionado pela coluna `por` (pasta destino/)."""
+    destino = Path(destino)
+    tabela = pyarrow.Table.from_pandas(transformar(df), preserve_index=False)
+    # grava numa pasta temporária e troca no fim: leitor nunca vê partição pela metade
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    pq.write_to_dataset(tabela, tmp, partition_cols=[por], basename_template="parte-{i}.parquet",
+                        compression=None if compressao == "nenhuma" else compressao)
+    # o antigo sai do caminho com um rename (atômico) e só então é apagado:
+    # destino nunca fica faltando nem pela metade enquanto o rmtree roda
+    antigo = destino.with_name(f"{destino.name}.{os.getpid()}.old")
+    shutil.rmtree(antigo, ignore_errors=True)
+    if destino.exists():
+        os.replace(destino, antigo)
+    os.replace(tmp, destino)
+    shutil.rmtree(antigo, ignore_errors=True)
+    return destino
+
+
+def exportar_csv(df: pd.DataFrame, destino: Path, tamanho_bloco: int = TAMANHO_BLOCO,
+                 transformar=_sem_transformar) -> Path:
+    """Grava df num CSV, `tamanho_bloco` linhas por vez (mesmo conteúdo do to_csv de uma vez)."""
+    destino = Path(destino)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        for i in range(0, max(len(df), 1), tamanho_bloco):
+            transformar(df.iloc[i:i + tamanho_bloco]).to_csv(f, header=(i == 0), index=False)
+    os.replace(tmp, destino)
+    return destino
+
+
+def exportar(df: pd.DataFrame, base: Path, formato: str = FORMATO, compressao: str = COMPRESSAO,
+             por: str = PARTICAO, transformar=_sem_transformar) -> Path:
+    """Parquet em base/ (particionado) ou CSV em base.csv; sem pyarrow, sempre CSV."""
+    base = Path(base)
+    if formato == "parquet" and pyarrow is None:
+        print("[exportacao] pyarrow não instalado; gravando CSV")
+        formato = "csv"
+    if formato == "parquet":
+        return exportar_parquet(df, base, por, compressao, transformar)
+    return exportar_csv(df, base.with_name(base.name + ".csv"), transformar=transformar)
+
+
+def ler_antecedente(destino: Path, antecedente: str, por: str = PARTICAO) -> pd.DataFrame:
+    """Só a partição de um antecedente de uma exportação Parquet."""
+    return pd.read_parquet(destino, filters=[(por, "==", antecedente)])
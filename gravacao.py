@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Gravação dos arquivos gerados fora do laço de render.
+#
+#   direta  cada render grava o seu arquivo (padrão; worker faz mkdir + savefig)
+#   lote    o gráfico é renderizado em memória (BytesIO) e uma thread grava
+#           os arquivos em lotes, criando cada pasta uma vez só: o render (ou
+#           a espera pelos workers) nunca para por causa do disco
+#   zip     como lote, mas tudo vai para um único <pasta de saída>.zip (os
+#           caminhos dentro do zip são os da pasta; PNG/PDF já vêm
+#           comprimidos, então ZIP_STORED)
+#
+# Em rede (SMB/NFS) cada arquivo pequeno gravado de forma síncrona custa uma
+# ida e volta; com lote/zip essas esperas saem do caminho do render.
+#
+# Requisitos: nenhum além da biblioteca padrão
+
+from pathlib import Path
+import io
+import os
+import queue
+import threading
+import zipfile
+
+MODOS = ("direta", "lote", "zip")
+TAMANHO_LOTE = 32  # arquivos gravados por vez pela thread
+FILA_MAX = 128     # arquivos em memória esperando gravação (o render espera se encher)
+
+
+class EmMemoria(io.BytesIO):
+    """Arquivo em memória com o nome do destino (o renderizador tira o formato dele)."""
+
+    def __init__(self, destino):
+        super().__init__()
+        self.name = str(destino)
+
+
+class Gravador:
+    """Thread que grava (destino, bytes) em lotes; quem renderiza só enfileira."""
+
+    def __init__(self, tamanho_lote: int = TAMANHO_LOTE, fila_max: int = FILA_MAX):
+        self.tamanho_lote = tamanho_lote
+        self.gravados = 0
+        self.erro = None
+        self._fila = queue.Queue(maxsize=fila_max)
+        self._pastas = set()
+        self._fechado = False
+        self._thread = threading.Thread(target=self._rodar, name="gravador", daemon=True)
+        self._thread.start()
+
+    def gravar(self, destino, dados: bytes):
+        """Enfileira o arquivo para a thread gravar.
+
+        Bloqueia quando já há fila_max (FILA_MAX) arquivos esperando, até a
+        thread liberar espaço: é o que limita a memória se o disco não
+        acompanhar o render.
+        """
+        if self.erro is not None:  # falhou antes: não adianta seguir renderizando
+            raise self.erro
+        self._fila.put((Path(destino), dados))
+
+    def _rodar(self):
+        fim = False
+        while not fim:
+            lote = [self._fila.get()]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            if lote[-1] is None:  # fechar() sempre enfileira o None por último
+                fim = True
+                lote.pop()
+            if lote and self.erro is None:
+                try:
+                    self._gravar_lote(lote)
+                except Exception as e:
+                    self.erro = e
+
+    def _gravar_lote(self, lote):
+        for destino, dados in lote:
+            if destino.parent not in self._pastas:
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                self._pastas.add(destino.parent)
+            destino.write_bytes(dados)
+            self.gravados += 1
+
+    def fechar(self, descartar: bool = False):
+        """Espera a fila esvaziar; levanta o erro da thread, se houve (só na 1ª chamada)."""
+        if self._fechado:
+            return
+        self._fechado = True
+        self._fila.put(None)
+        self._thread.join()
+        if self.erro is not None and not descartar:
+            raise self.erro
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *_):
+        self.fechar(descartar=tipo is not None)
+
+
+class GravadorZip(Gravador):
+    """Gravador que põe todos os arquivos num único zip (trocado por inteiro no fechar)."""
+
+    def __init__(self, arquivo: Path, raiz: Path, **kwargs):
+        self.arquivo = Path(arquivo)
+        self.raiz = Path(raiz)
+        self._tmp = self.arquivo.with_name(f"{self.arquivo.name}.{os.getpid()}.tmp")
+        self._zip = zipfile.ZipFile(self._tmp, "w", zipfile.ZIP_STORED)
+        super().__init__(**kwargs)
+
+    def _gravar_lote(self, lote):
+        for destino, dados in lote:
+            self._zip.writestr(destino.relative_to(self.raiz).as_posix(), dados)
+            self.gravados += 1
+
+    def fechar(self, descartar: bool = False):
+        if self._zip is None:
+            return
+        try:
+            super().fechar(descartar)
+        finally:
+            self._zip.close()
+            self._zip = None
+            if descartar or self.erro is not None:
+                self._tmp.unlink(missing_ok=True)
+            else:  # quem lê o zip nunca vê um pela metade
+                os.replace(self._tmp, self.arquivo)
+
+
+def arquivo_zip(out_dir: Path) -> Path:
+    out_dir = Path(out_dir)
+    return out_dir.with_name(out_dir.name + ".zip")
+
+
+def abrir_gravador(modo: str, out_dir: Path):
+    """Gravador do modo (None em "direta": cada render grava o seu arquivo)."""
+    if modo == "direta":
+        return None
+    if modo == "zip":
+        return GravadorZip(arquivo_zip(out_dir), out_dir)
+    return Gravador()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# Instrumentação das execuções (--profile): tempo e memória de cada etapa
+# (carga, normalização, agregação, render...), tempo de cada figura e,
+# opcionalmente, estatísticas do cProfile. O relatório vai para a pasta dos
+# gráficos: perfil_execucao.json / .txt (/ .prof).
+#
+# Memória: por padrão o RSS do processo no fim de cada etapa (barato); com
+# --profile-memoria, o pico de alocações Python por etapa via tracemalloc
+# (bem mais preciso, mas deixa o render umas 4x mais lento).
+#
+# Sem --profile as chamadas etapa()/figura() não fazem nada (custo ~zero).
+#
+# Requisitos: nenhum além da biblioteca padrão
+
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+
+ARQUIVO_RELATORIO = "perfil_execucao"
+
+_ATIVO = None  # Perfil da execução atual (None = instrumentação desligada)
+
+
+def _rss_mb():
+    # memória residente atual (Linux); None onde não há /proc
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Perfil:
+    """Coleta etapas (aninháveis) e figuras de uma execução."""
+
+    def __init__(self, script: str, memoria: bool = False, cprofile: bool = False):
+        self.script = script
+        self.memoria = memoria
+        self.etapas = []
+        self.figuras = []
+        self._pilha = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._t0 = time.perf_counter()
+
+    def iniciar(self):
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self._cprofile:
+            self._cprofile.enable()
+        self._t0 = time.perf_counter()
+
+    def parar(self):
+        self.total_s = time.perf_counter() - self._t0
+        if self._cprofile:
+            self._cprofile.disable()
+        if self.memoria and tracemalloc.is_tracing():
+            self.pico_total_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+    @contextmanager
+    def etapa(self, nome: str, **extra):
+        registro = {"etapa": nome, "nivel": len(self._pilha), **extra}
+        self.etapas.append(registro)
+        if self.memoria:
+            atual = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            registro["_pico_filhos"] = 0
+        else:
+            rss = _rss_mb()
+        self._pilha.append(registro)
+        t0 = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro["tempo_s"] = round(time.perf_counter() - t0, 4)
+            self._pilha.pop()
+            if self.memoria:
+                fim, pico = tracemalloc.get_traced_memory()
+                pico = max(pico, registro.pop("_pico_filhos"))
+                registro["pico_mb"] = round((pico - atual) / 2**20, 2)
+                registro["delta_mb"] = round((fim - atual) / 2**20, 2)
+                if self._pilha:  # reset_peak da filha não pode esconder o pico da mãe
+                    mae = self._pilha[-1]
+                    mae["_pico_filhos"] = max(mae["_pico_filhos"], pico)
+            elif rss is not None:
+                fim = _rss_mb()
+                registro["rss_mb"] = round(fim, 1)
+                registro["delta_rss_mb"] = round(fim - rss, 1)
+
+    def figura(self, arquivo, tempo_s: float, **extra):
+        self.figuras.append({"arquivo": str(arquivo), "tempo_s": round(tempo_s, 4), **extra})
+
+    def relatorio(self) -> dict:
+        por_grupo = {}
+        for f in self.figuras:
+            grupo = Path(f["arquivo"]).parent.name
+            por_grupo[grupo] = round(por_grupo.get(grupo, 0) + f["tempo_s"], 4)
+        return {
+            "script": self.script,
+            "quando": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "total_s": round(getattr(self, "total_s", time.perf_counter() - self._t0), 4),
+            "pico_total_mb": round(getattr(self, "pico_total_mb", 0.0), 2) if self.memoria else None,
+            "rss_final_mb": None if self.memoria or _rss_mb() is None else round(_rss_mb(), 1),
+            "etapas": self.etapas,
+            "figuras": self.figuras,
+            "render_por_pasta_s": por_grupo,
+        }
+
+    def texto(self, rel: dict, n_figuras: int = 10) -> str:
+        cabecalho = f"{rel['script']} — {rel['quando']} — total {rel['total_s']:.3f}s"
+        if rel["pico_total_mb"] is not None:
+            cabecalho += f", pico Python {rel['pico_total_mb']:.1f} MB (tracemalloc)"
+        elif rel.get("rss_final_mb") is not None:
+            cabecalho += f", RSS final {rel['rss_final_mb']:.1f} MB"
+        memoria = "pico MB" if self.memoria else "ΔRSS MB"
+        linhas = [cabecalho, "", f"{'etapa':32s} {'tempo':>9s} {'%':>6s} {memoria:>9s}"]
+        for e in rel["etapas"]:
+            pct = 100 * e["tempo_s"] / rel["total_s"] if rel["total_s"] else 0
+            mem = e.get("pico_mb", e.get("delta_rss_mb"))
+            mem = f"{mem:9.2f}" if mem is not None else f"{'':9s}"
+            linhas.append(f"{'  ' * e['nivel'] + e['etapa']:32s} {e['tempo_s']:8.3f}s {pct:5.1f}% {mem}")
+        if rel["figuras"]:
+            tempos = sorted(rel["figuras"], key=lambda f: -f["tempo_s"])
+            soma = sum(f["tempo_s"] for f in tempos)
+            linhas += ["", f"{len(tempos)} figuras, {soma:.3f}s somadas "
+                           f"(média {soma / len(tempos) * 1000:.1f} ms); mais lentas:"]
+            for f in tempos[:n_figuras]:
+                partes = "".join(f"  {k}={v:.3f}s" for k, v in f.items()
+                                 if k not in ("arquivo", "tempo_s") and isinstance(v, float))
+                linhas.append(f"  {f['tempo_s']:8.3f}s  {f['arquivo']}{partes}")
+            linhas += ["", "render por pasta (antecedente):"]
+            for grupo, t in sorted(rel["render_por_pasta_s"].items(), key=lambda kv: -kv[1]):
+                linhas.append(f"  {t:8.3f}s  {grupo or '.'}")
+        return "\n".join(linhas) + "\n"
+
+    def salvar(self, out_dir: Path):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base = out_dir / ARQUIVO_RELATORIO
+        rel = self.relatorio()
+        arquivos = [base.with_suffix(".json"), base.with_suffix(".txt")]
+        arquivos[0].write_text(json.dumps(rel, indent=2, ensure_ascii=False), encoding="utf-8")
+        arquivos[1].write_text(self.texto(rel), encoding="utf-8")
+        if self._cprofile:
+            prof = base.with_suffix(".prof")
+            self._cprofile.dump_stats(prof)  # abrir com: python -m pstats / snakeviz
+            with base.with_suffix(".cprofile.txt").open("w", encoding="utf-8") as f:
+                pstats.Stats(self._cprofile, stream=f).sort_stats("cumulative").print_stats(40)
+            arquivos += [prof, base.with_suffix(".cprofile.txt")]
+        return arquivos
+
+
+def iniciar(script: str = None, memoria: bool = False, cprofile: bool = False) -> Perfil:
+    """Liga a instrumentação para o resto do processo."""
+    global _ATIVO
+    _ATIVO = Perfil(script or Path(sys.argv[0]).name, memoria, cprofile)
+    _ATIVO.iniciar()
+    return _ATIVO
+
+
+def encerrar(out_dir: Path):
+    """Desliga a instrumentação e grava o relatório em out_dir; devolve os arquivos."""
+    global _ATIVO
+    if _ATIVO is None:
+        return []
+    perfil, _ATIVO = _ATIVO, None
+    perfil.parar()
+    arquivos = perfil.salvar(out_dir)
+    print(perfil.texto(perfil.relatorio()), end="")
+    return arquivos
+
+
+def etapa(nome: str, **extra):
+    """with etapa("agregacao"): ...  — mede só se a instrumentação estiver ligada."""
+    return _ATIVO.etapa(nome, **extra) if _ATIVO is not None else nullcontext()
+
+
+def figura(arquivo, tempo_s: float, **extra):
+    if _ATIVO is not None:
+        _ATIVO.figura(arquivo, tempo_s, **extra)
+
+
+@contextmanager
+def medir_figura(arquivo, **extra):
+    """with medir_figura(out_png): plot(...)  — registra o tempo da figura se ligado."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        figura(arquivo, time.perf_counter() - t0, **extra)
+
+
+def argumentos(ap):
+    """Acrescenta --profile/--cprofile a um ArgumentParser."""
+    ap.add_argument("--profile", action="store_true",
+                    help=f"mede tempo/memória por etapa e por figura; relatório {ARQUIVO_RELATORIO}.* "
+                         "na pasta dos gráficos")
+    ap.add_argument("--profile-memoria", action="store_true",
+                    help="--profile com pico de memória por etapa via tracemalloc (render fica mais lento)")
+    ap.add_argument("--cprofile", action="store_true",
+                    help="--profile + estatísticas do cProfile (.prof e .cprofile.txt)")
+
+
+def iniciar_se_pedido(args, script: str = None):
+    if args.profile or args.profile_memoria or args.cprofile:
+        iniciar(script, memoria=args.profile_memoria, cprofile=args.cprofile)
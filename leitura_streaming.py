@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# Leitura em blocos das exportações de regras (XLSX do Weka ou CSV) para
+# planilhas grandes demais para o pd.read_excel: só as colunas usadas são
+# guardadas e cada bloco é descartado depois de agregado, então a memória fica
+# limitada pelo tamanho do bloco + número de células do cubo.
+#
+# Requisitos: pip install pandas openpyxl
+
+from pathlib import Path
+
+import pandas as pd
+
+COLUNAS_REGRAS = ("Antecendente", "Consequente", "Lift", "Daricelio")
+TAMANHO_BLOCO = 50_000
+
+
+def iterar_blocos(caminho: Path, sheet_name=None, colunas=COLUNAS_REGRAS,
+                  tamanho: int = TAMANHO_BLOCO):
+    """Gera DataFrames de até `tamanho` linhas só com as `colunas` pedidas."""
+    if Path(caminho).suffix.lower() in {".csv", ".txt"}:
+        yield from iterar_blocos_csv(caminho, colunas, tamanho)
+    else:
+        yield from iterar_blocos_xlsx(caminho, sheet_name, colunas, tamanho)
+
+
+def iterar_blocos_csv(caminho: Path, colunas=COLUNAS_REGRAS, tamanho: int = TAMANHO_BLOCO):
+    yield from pd.read_csv(caminho, usecols=list(colunas), chunksize=tamanho)
+
+
+def _escolher_aba(wb, sheet_name, colunas):
+    if isinstance(sheet_name, int):
+        return wb.worksheets[sheet_name]
+    if sheet_name is not None:
+        return wb[sheet_name]
+    # como no carregar_df: primeira aba que tenha as colunas esperadas
+    for ws in wb.worksheets:
+        cabecalho = next(ws.iter_rows(max_row=1, values_only=True), ())
+        if set(colunas) <= set(cabecalho):
+            return ws
+    raise SystemExit(f"Nenhuma aba com as colunas {list(colunas)}.")
+
+
+def iterar_blocos_xlsx(caminho: Path, sheet_name=None, colunas=COLUNAS_REGRAS,
+                       tamanho: int = TAMANHO_BLOCO):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        ws = _escolher_aba(wb, sheet_name, colunas)
+        linhas = ws.iter_rows(values_only=True)
+        cabecalho = list(next(linhas, ()))
+        faltando = [c for c in colunas if c not in cabecalho]
+        if faltando:
+            raise KeyError(f"Colunas ausentes em {caminho}: {faltando}")
+        idx = [cabecalho.index(c) for c in colunas]
+
+        bloco = []
+        for linha in linhas:
+            bloco.append(tuple(linha[i] if i < len(linha) else None for i in idx))
+            if len(bloco) >= tamanho:
+                yield pd.DataFrame.from_records(bloco, columns=list(colunas))
+                bloco = []
+        if bloco:
+            yield pd.DataFrame.from_records(bloco, columns=list(colunas))
+    finally:
+        wb.close()
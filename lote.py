@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# Execução em lote do comparativo4 para vários cenários (planilhas/abas) de uma vez.
+#
+#   python lote.py CenarioApenasLifetime.xlsx CenarioApenasReviwer.xlsx:Planilha1 pasta/ --jobs 0
+#
+# Cada cenário vai para GraficosGerados_LOTE/<planilha>[__<aba>]/. As planilhas
+# são carregadas em paralelo e todos os gráficos de todos os cenários passam
+# pelo MESMO pool de processos; no fim sai um resumo único por cenário.
+#
+# Requisitos: pip install pandas matplotlib openpyxl
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import contextlib
+import io
+import os
+import queue
+import re
+import time
+
+import comparativo4
+from cubo_mapeado import publicar_cubo
+from gravacao import MODOS as MODOS_GRAVACAO, abrir_gravador
+from manifesto import remover_orfaos, salvar_manifesto
+from renderizador import PERFIS_SAIDA
+
+# =================== CONFIGURE AQUI ===================
+OUT_BASE = Path("GraficosGerados_LOTE")
+# ======================================================
+
+
+def listar_cenarios(especificacoes, aba_padrao=None):
+    """'arquivo.xlsx', 'arquivo.xlsx:Aba' ou uma pasta (todos os .xlsx/.csv dela) -> [(caminho, aba)].
+
+    A aba (a da entrada ou aba_padrao) só vale para .xlsx; CSV não tem aba.
+    """
+    cenarios = []
+    for espec in especificacoes:
+        caminho, aba = Path(espec), aba_padrao
+        if not caminho.exists() and ":" in espec:
+            arq, _, aba = espec.rpartition(":")
+            caminho = Path(arq)
+        if caminho.is_dir():
+            arquivos = sorted(p for p in caminho.iterdir()
+                              if p.suffix.lower() in {".xlsx", ".csv"} and not p.name.startswith("~$"))
+        else:
+            arquivos = [caminho]
+        for p in arquivos:
+            cenario = (p, aba if p.suffix.lower() == ".xlsx" else None)
+            if cenario not in cenarios:  # mesma entrada duas vezes (ex.: arquivo e a pasta dele)
+                cenarios.append(cenario)
+    return cenarios
+
+
+def nome_cenario(caminho: Path, aba=None):
+    nome = caminho.stem if aba is None else f"{caminho.stem}__{aba}"
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", nome)
+
+
+def verificar_nomes(cenarios):
+    """Levanta ValueError se dois cenários diferentes iriam para a mesma pasta de saída.
+
+    Ex.: a/Cenario.xlsx e b/Cenario.xlsx -> ambos em <saída>/Cenario.
+    """
+    por_nome = {}
+    for caminho, aba in cenarios:
+        por_nome.setdefault(nome_cenario(caminho, aba), set()).add((str(Path(caminho).resolve()), aba))
+    repetidos = {nome: sorted(c for c, _ in origens) for nome, origens in por_nome.items() if len(origens) > 1}
+    if repetidos:
+        detalhes = "; ".join(f"{nome}: {', '.join(origens)}" for nome, origens in repetidos.items())
+        raise ValueError(f"cenários com a mesma pasta de saída (renomeie ou rode em lotes separados): {detalhes}")
+
+
+def _carregar(caminho, aba, streaming, intervalos):
+    # roda num worker: devolve só o cubo (pequeno), não o DataFrame das regras
+    with contextlib.redirect_stdout(io.StringIO()):
+        return comparativo4.carregar_cubo(caminho, aba, streaming, intervalos)
+
+
+def _iniciar_cenario(item, futuro, pool, recursos, out_base, forcar, saida, agrupar, perfil, gravacao):
+    """Cubo carregado -> planeja as saídas e submete os renders; None se a carga falhou."""
+    try:
+        cubo = futuro.result()
+    except Exception as e:
+        item["erro"] = f"{type(e).__name__}: {e}"
+        return None
+    out_dir = out_base / item["cenario"]
+    em_zip = gravacao == "zip"  # um .zip por cenário, sempre completo, sem manifesto
+    with contextlib.redirect_stdout(io.StringIO()):
+        saidas, pendentes, entradas, orfaos = comparativo4.planejar_saidas(
+            cubo, out_dir, forcar or em_zip, saida, agrupar, perfil)
+    if em_zip:
+        orfaos = []
+    remover_orfaos(orfaos)
+    item.update(celulas=len(cubo), arquivos=len(saidas), gerados=len(pendentes),
+                pulados=len(saidas) - len(pendentes), removidos=len(orfaos))
+    # os workers leem os dados do cubo mapeado; a tarefa leva só os códigos
+    mapeado = recursos.enter_context(publicar_cubo(cubo, comparativo4.CONSEQ_ORDER))
+    gravador = abrir_gravador(gravacao, out_dir)
+    if gravador is not None:
+        recursos.enter_context(gravador)
+    tarefas = comparativo4.tarefas_mapeadas(pendentes, cubo, mapeado, saida, perfil)
+    render = partial(comparativo4._renderizar_mapeado, em_memoria=gravador is not None)
+    futuros = [pool.submit(render, t) for t in tarefas]
+    return {"out_dir": out_dir, "entradas": entradas, "mapeado": mapeado, "gravador": gravador,
+            "futuros": futuros, "faltam": len(futuros), "falhas": []}
+
+
+def _concluir_cenario(item, cen, gravacao):
+    """Todos os renders do cenário voltaram: fecha gravador/cubo mapeado e grava o manifesto."""
+    falhas = cen["falhas"]
+    if cen["gravador"] is not None:
+        try:
+            cen["gravador"].fechar(descartar=bool(falhas))
+        except Exception as e:
+            falhas.append(f"{type(e).__name__}: {e}")
+    cen["mapeado"].fechar()
+    if falhas:
+        item["erro"] = f"{len(falhas)} gráficos falharam; 1º: {falhas[0]}"
+    elif gravacao != "zip":
+        salvar_manifesto(cen["out_dir"], cen["entradas"])
+
+
+def executar_lote(cenarios, out_base: Path = OUT_BASE, jobs: int = 0, forcar: bool = False,
+                  saida: str = "png", agrupar: str = "antecedente", perfil: str = "publicacao",
+                  streaming: bool = False, intervalos: bool = False, gravacao: str = "direta"):
+    verificar_nomes(cenarios)
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    # resumo na ordem das entradas, qualquer que seja a ordem em que terminam
+    resumo = [{"cenario": nome_cenario(caminho, aba), "entrada": str(caminho), "aba": aba}
+              for caminho, aba in cenarios]
+    # cubos mapeados e gravadores (um por cenário) fecham no fim do cenário ou, se
+    # algo der errado no meio, quando o pool termina
+    with contextlib.ExitStack() as recursos, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=comparativo4._iniciar_worker) as pool:
+        # cada futuro pronto (carga ou render) cai nesta fila; o laço abaixo trata na ordem
+        # em que ficam prontos (o callback roda na thread do pool: só enfileira)
+        prontos = queue.SimpleQueue()
+        origem = {}
+
+        def acompanhar(futuro, item, cen):
+            origem[futuro] = (item, cen)
+            futuro.add_done_callback(prontos.put)
+
+        # 1) todas as planilhas carregando ao mesmo tempo
+        inicio = {}
+        for item, (caminho, aba) in zip(resumo, cenarios):
+            inicio[id(item)] = time.perf_counter()
+            acompanhar(pool.submit(_carregar, caminho, aba, streaming, intervalos), item, None)
+
+        # 2) cubo que chega põe os gráficos dele na fila do mesmo pool; gráfico que
+        #    chega vai direto para o gravador do seu cenário (a escrita anda junto
+        #    com o render, sem juntar os bytes de tudo em memória)
+        while origem:
+            futuro = prontos.get()
+            item, cen = origem.pop(futuro)
+            if cen is None:
+                cen = _iniciar_cenario(item, futuro, pool, recursos, out_base, forcar, saida,
+                                       agrupar, perfil, gravacao)
+                if cen is None:
+                    continue
+                for f in cen["futuros"]:
+                    acompanhar(f, item, cen)
+            else:
+                try:
+                    destino, _, conteudo = futuro.result()
+                    if cen["gravador"] is not None:
+                        # bloqueia se a fila do gravador estiver cheia (FILA_MAX):
+                        # a coleta espera o disco, os workers seguem renderizando
+                        cen["gravador"].gravar(destino, conteudo)
+                except Exception as e:
+                    cen["falhas"].append(f"{type(e).__name__}: {e}")
+                cen["faltam"] -= 1
+            if cen["faltam"] == 0:
+                _concluir_cenario(item, cen, gravacao)
+                item["tempo_s"] = round(time.perf_counter() - inicio[id(item)], 2)
+    return resumo
+
+
+def imprimir_resumo(resumo):
+    print(f"\n{'cenário':40s} {'células':>8s} {'arquivos':>8s} {'gerados':>8s} {'pulados':>8s} {'tempo':>8s}")
+    for r in resumo:
+        if "celulas" not in r:
+            print(f"{r['cenario']:40s} ERRO: {r['erro']}")
+            continue
+        print(f"{r['cenario']:40s} {r['celulas']:8d} {r['arquivos']:8d} {r['gerados']:8d} "
+              f"{r['pulados']:8d} {r.get('tempo_s', 0):7.2f}s" + (f"  ERRO: {r['erro']}" if "erro" in r else ""))
+    ok = sum("erro" not in r for r in resumo)
+    print(f"\n{ok}/{len(resumo)} cenários concluídos.")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Roda o comparativo4 para vários cenários num único lote.")
+    ap.add_argument("entradas", nargs="+",
+                    help="planilhas (arquivo.xlsx ou arquivo.xlsx:Aba), CSVs ou pastas")
+    ap.add_argument("--aba", default=comparativo4.SHEET_NAME,
+                    help="aba usada quando a entrada não diz qual")
+    ap.add_argument("--saida-base", type=Path, default=OUT_BASE)
+    ap.add_argument("--jobs", type=int, default=0, help="processos do pool (0 = todos os núcleos)")
+    ap.add_argument("--forcar", action="store_true")
+    ap.add_argument("--saida", choices=["png", "pdf", "folha", "cubo"], default=comparativo4.SAIDA)
+    ap.add_argument("--agrupar", choices=["antecedente", "execucao"], default=comparativo4.AGRUPAR)
+    ap.add_argument("--perfil", choices=sorted(PERFIS_SAIDA), default=comparativo4.PERFIL)
+    ap.add_argument("--gravacao", choices=list(MODOS_GRAVACAO), default=comparativo4.GRAVACAO,
+                    help="direta, lote (thread grava em lotes) ou zip (um <cenário>.zip por cenário)")
+    ap.add_argument("--streaming", action="store_true")
+    ap.add_argument("--intervalos", action="store_true", default=comparativo4.INTERVALOS)
+    args = ap.parse_args(argv)
+
+    cenarios = listar_cenarios(args.entradas, args.aba)
+    try:
+        verificar_nomes(cenarios)
+    except ValueError as e:
+        ap.error(str(e))
+    print(f"{len(cenarios)} cenários -> {args.saida_base}")
+    resumo = executar_lote(cenarios, args.saida_base, args.jobs, args.forcar,
+                           args.saida, args.agrupar, args.perfil, args.streaming, args.intervalos,
+                           args.gravacao)
+    imprimir_resumo(resumo)
+    if any("erro" in r for r in resumo):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
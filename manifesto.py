@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# Manifesto de gráficos gerados: guarda, para cada PNG da pasta de saída, um hash
+# dos dados agregados que ele mostra + do estilo usado para desenhá-lo
+# (em PDF/folha, um hash por arquivo cobrindo todos os gráficos dele).
+# Numa nova execução só são redesenhados os gráficos cujo hash mudou; PNGs que
+# estavam no manifesto e não são mais gerados (órfãos) são apagados.
+#
+# Requisitos: pip install numpy matplotlib
+
+from importlib.metadata import version
+from pathlib import Path
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from cache_planilha import hash_fontes
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+VERSAO_MANIFESTO = 1
+
+
+def assinatura_estilo(*funcs, fontes=(), **config) -> str:
+    """Hash do código das funções de desenho (inclui as constantes de estilo) + config extra.
+
+    Aceita também classes: entram todos os métodos definidos nela. Em `fontes`
+    vão os módulos cujo fonte inteiro entra no hash (ex.: renderizador: cores,
+    mapas de calor e helpers de módulo, que o __code__ das funções não cobre).
+    """
+    h = hashlib.sha1(f"matplotlib {version('matplotlib')}".encode())
+    if fontes:
+        h.update(hash_fontes(*fontes).encode())
+    for f in funcs:
+        codigos = [m.__code__ for m in vars(f).values() if hasattr(m, "__code__")] \
+                  if isinstance(f, type) else [f.__code__]
+        for code in codigos:
+            _hash_codigo(h, code)
+    h.update(json.dumps(config, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _hash_codigo(h, code):
+    # code objects aninhados (comprehensions, lambdas) têm endereço no repr: desce neles
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _hash_codigo(h, const)
+        else:
+            h.update(repr(const).encode("utf-8"))
+
+
+def hash_grafico(grafico, assinatura: str) -> str:
+    # grafico = (*dados, out_png): o caminho é a chave, não entra no hash
+    h = hashlib.sha1(assinatura.encode("utf-8"))
+    for parte in grafico[:-1]:
+        if isinstance(parte, np.ndarray):
+            h.update(np.ascontiguousarray(parte, dtype=np.float64).tobytes())
+        else:
+            h.update(json.dumps(parte, default=str, ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+def hash_saida(graficos, assinatura: str) -> str:
+    # arquivo com um gráfico só (PNG) usa o hash do próprio gráfico
+    if len(graficos) == 1:
+        return hash_grafico(graficos[0], assinatura)
+    h = hashlib.sha1()
+    for grafico in graficos:
+        h.update(hash_grafico(grafico, assinatura).encode("ascii"))
+    return h.hexdigest()
+
+
+def _chave(out_png: Path, out_dir: Path) -> str:
+    return Path(out_png).relative_to(out_dir).as_posix()
+
+
+def carregar_manifesto(out_dir: Path) -> dict:
+    arq = Path(out_dir) / ARQUIVO_MANIFESTO
+    try:
+        dados = json.loads(arq.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if dados.get("versao") != VERSAO_MANIFESTO:
+        return {}
+    return dados.get("graficos", {})
+
+
+def salvar_manifesto(out_dir: Path, entradas: dict):
+    arq = Path(out_dir) / ARQUIVO_MANIFESTO
+    tmp = arq.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"versao": VERSAO_MANIFESTO, "graficos": entradas},
+                              indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, arq)
+
+
+def comparar_manifesto(saidas, out_dir: Path, assinatura: str, forcar: bool = False):
+    """Separa os arquivos que precisam ser redesenhados.
+
+    saidas: lista de (destino, gráficos, ...) — ver comparativo4.agrupar_saidas.
+    Devolve (pendentes, entradas_novas, orfaos): as saídas a desenhar, o manifesto
+    que valerá depois de desenhá-las e os arquivos que devem ser apagados.
+    """
+    out_dir = Path(out_dir)
+    anterior = carregar_manifesto(out_dir)
+    antigo = {} if forcar else anterior
+
+    pendentes, entradas = [], {}
+    for item in saidas:
+        destino, graficos = item[0], item[1]
+        chave = _chave(destino, out_dir)
+        entradas[chave] = hash_saida(graficos, assinatura)
+        if antigo.get(chave) != entradas[chave] or not Path(destino).exists():
+            pendentes.append(item)
+
+    orfaos = [out_dir / chave for chave in anterior if chave not in entradas]
+    return pendentes, entradas, orfaos
+
+
+def remover_orfaos(orfaos):
+    for png in orfaos:
+        png.unlink(missing_ok=True)
+        # apaga a subpasta do antecedente se ficou vazia
+        try:
+            png.parent.rmdir()
+        except OSError:
+            pass
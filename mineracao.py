@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Mineração das regras "antecedente=valor → consequente=valor" direto dos
+# atributos discretizados dos PRs (uma linha por PR, uma coluna por atributo:
+# changedFiles_D, life_time, typeDeveloper, ...), sem passar pelo Weka.
+#
+#   python mineracao.py prs.csv --consequentes life_time \
+#       --referencia CenarioApenasLifetime.xlsx:Planilha1 --saida CenarioMinerado.csv
+#   python comparativo4.py --entrada CenarioMinerado.csv
+#
+# O comparativo4 compara o Lift minerado com o Daricelio: sem --referencia a
+# coluna Daricelio sai vazia e o comparativo4 recusa o arquivo (use a saída só
+# para inspecionar as regras).
+#
+# Para cada par (coluna antecedente, coluna consequente) a tabela de
+# contingência inteira sai de um único np.bincount sobre os códigos
+# (grupo, valor do antecedente, valor do consequente); suporte, confiança,
+# lift, leverage e conviction são contas vetoriais sobre essas contagens.
+# Nenhum laço por PR ou por regra.
+#
+# A saída tem as colunas do XLSX que o carregar_df lê (Antecendente,
+# Consequente, Suporte, Confianca, Lift, Leverage, Conviction, Daricelio); o
+# Daricelio vem da planilha de --referencia (vazio sem ela).
+#
+# Requisitos: pip install pandas numpy openpyxl
+
+from pathlib import Path
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from normalizacao import ANTECEDENTES_VALIDOS
+
+# =================== CONFIGURE AQUI ===================
+CONSEQUENTES = ["life_time"]  # colunas usadas como consequente
+SUPORTE_MIN = 0.0
+CONFIANCA_MIN = 0.0
+COLUNA_REFERENCIA = "Daricelio"
+# ======================================================
+
+MEDIDAS_REGRAS = ["Suporte", "Confianca", "Lift", "Leverage", "Conviction"]
+
+
+def _codigos(serie: pd.Series):
+    """(códigos int64, -1 = ausente; textos de cada código), um str() por valor distinto."""
+    codigos, unicos = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64), np.array([str(u).strip() for u in unicos], dtype=object)
+
+
+def contagens(ant, n_ant, cons, n_cons, grupo, n_grupos):
+    """Contagens (grupo, ant, cons), (grupo, ant), (grupo, cons) e (grupo,) via bincount.
+
+    Linhas com o antecedente ausente não contam para n_a nem n_ac (idem para o
+    consequente), mas contam no total do grupo, como no Weka.
+    """
+    ok_a, ok_c = ant >= 0, cons >= 0
+    ambos = ok_a & ok_c
+    n_ac = np.bincount(((grupo * n_ant + ant) * n_cons + cons)[ambos],
+                       minlength=n_grupos * n_ant * n_cons).reshape(n_grupos, n_ant, n_cons)
+    n_a = np.bincount((grupo * n_ant + ant)[ok_a], minlength=n_grupos * n_ant).reshape(n_grupos, n_ant)
+    n_c = np.bincount((grupo * n_cons + cons)[ok_c], minlength=n_grupos * n_cons).reshape(n_grupos, n_cons)
+    n = np.bincount(grupo, minlength=n_grupos)
+    return n_ac, n_a, n_c, n
+
+
+def medidas(n_ac, n_a, n_c, n):
+    """Suporte, confiança, lift, leverage e conviction de todas as células de uma vez."""
+    n = n[:, None, None].astype(np.float64)
+    p_a = n_a[:, :, None] / n
+    p_c = n_c[:, None, :] / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        suporte = n_ac / n
+        confianca = n_ac / n_a[:, :, None]
+        lift = confianca / p_c
+        leverage = suporte - p_a * p_c
+        conviction = np.where(confianca < 1, (1 - p_c) / (1 - confianca), np.inf)
+    return suporte, confianca, lift, leverage, conviction
+
+
+def minerar_regras(prs: pd.DataFrame, antecedentes=ANTECEDENTES_VALIDOS, consequentes=CONSEQUENTES,
+                   por: str = None, suporte_min: float = SUPORTE_MIN,
+                   confianca_min: float = CONFIANCA_MIN) -> pd.DataFrame:
+    """Todas as regras de um antecedente → um consequente (com ao menos um PR).
+
+    por: coluna de agrupamento (ex.: "Base", um projeto por grupo); as
+    medidas são calculadas dentro de cada grupo e a coluna vai para a saída.
+    """
+    faltando = [c for c in list(antecedentes) + list(consequentes) if c not in prs.columns]
+    if faltando:
+        print(f"[mineracao] colunas ausentes, ignoradas: {faltando}")
+    if por is None:
+        grupo, nomes_grupo = np.zeros(len(prs), dtype=np.int64), np.array([None], dtype=object)
+    else:
+        grupo, nomes_grupo = _codigos(prs[por])
+        manter = grupo >= 0  # PR sem grupo fica de fora
+        prs, grupo = prs[manter], grupo[manter]
+    n_grupos = len(nomes_grupo)
+
+    codigos = {c: _codigos(prs[c]) for c in dict.fromkeys(list(antecedentes) + list(consequentes))
+               if c in prs.columns}
+    partes = []
+    for col_c in consequentes:
+        if col_c not in codigos:
+            continue
+        cons, valores_c = codigos[col_c]
+        rotulos_c = np.array([f"{col_c}={v}" for v in valores_c], dtype=object)
+        for col_a in antecedentes:
+            if col_a not in codigos or col_a == col_c:
+                continue
+            ant, valores_a = codigos[col_a]
+            rotulos_a = np.array([f"{col_a}={v}" for v in valores_a], dtype=object)
+            n_ac, n_a, n_c, n = contagens(ant, len(valores_a), cons, len(valores_c), grupo, n_grupos)
+            sup, conf, lift, lev, conv = medidas(n_ac, n_a, n_c, n)
+
+            g, a, c = np.nonzero((n_ac > 0) & (sup >= suporte_min) & (conf >= confianca_min))
+            parte = {
+                "Antecendente": rotulos_a[a],
+                "Consequente": rotulos_c[c],
+                "Suporte": sup[g, a, c],
+                "Confianca": conf[g, a, c],
+                "Lift": lift[g, a, c],
+                "Leverage": lev[g, a, c],
+                "Conviction": conv[g, a, c],
+            }
+            if por is not None:
+                parte = {por: nomes_grupo[g], **parte}
+            partes.append(pd.DataFrame(parte))
+    if not partes:
+        return pd.DataFrame(columns=([por] if por else []) + ["Antecendente", "Consequente"] + MEDIDAS_REGRAS)
+    return pd.concat(partes, ignore_index=True)
+
+
+def anexar_referencia(regras: pd.DataFrame, referencia: pd.DataFrame,
+                      coluna: str = COLUNA_REFERENCIA) -> pd.DataFrame:
+    """Traz a coluna de referência (Daricelio) da planilha antiga, casando pelas regras."""
+    chaves = [c for c in ("Base", "Antecendente", "Consequente")
+              if c in regras.columns and c in referencia.columns]
+    ref = referencia[chaves + [coluna]].copy()
+    for c in chaves:  # mesma grafia dos rótulos minerados ("ant=valor", sem espaços nas pontas)
+        ref[c] = ref[c].astype(str).str.strip()
+    ref = ref.drop_duplicates(subset=chaves)
+    return regras.merge(ref, on=chaves, how="left")
+
+
+def _ler(caminho: Path, aba=None) -> pd.DataFrame:
+    sufixo = Path(caminho).suffix.lower()
+    if sufixo == ".csv":
+        return pd.read_csv(caminho)
+    if sufixo == ".parquet":
+        return pd.read_parquet(caminho)
+    return pd.read_excel(caminho, sheet_name=aba if aba is not None else 0)
+
+
+def _caminho_aba(espec: str):
+    caminho = Path(espec)
+    if not caminho.exists() and ":" in espec:
+        arq, _, aba = espec.rpartition(":")
+        return Path(arq), aba
+    return caminho, None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Minera regras antecedente → consequente dos atributos dos PRs.")
+    ap.add_argument("prs", help="CSV/XLSX/Parquet com um PR por linha (arquivo.xlsx:Aba para escolher a aba)")
+    ap.add_argument("--antecedentes", nargs="+", default=ANTECEDENTES_VALIDOS)
+    ap.add_argument("--consequentes", nargs="+", default=CONSEQUENTES)
+    ap.add_argument("--por", help="coluna de agrupamento (ex.: Base): regras calculadas por grupo")
+    ap.add_argument("--suporte-min", type=float, default=SUPORTE_MIN)
+    ap.add_argument("--confianca-min", type=float, default=CONFIANCA_MIN)
+    ap.add_argument("--referencia",
+                    help=f"planilha de regras com a coluna {COLUNA_REFERENCIA} (arquivo.xlsx:Aba); "
+                         "necessária para usar a saída no comparativo4")
+    ap.add_argument("--saida", type=Path, default=Path("regras_mineradas.csv"),
+                    help="CSV (lido em streaming pelo comparativo4) ou XLSX (aba Planilha1)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    prs = _ler(*_caminho_aba(args.prs))
+    t1 = time.perf_counter()
+    regras = minerar_regras(prs, args.antecedentes, args.consequentes, args.por,
+                            args.suporte_min, args.confianca_min)
+    t2 = time.perf_counter()
+    if args.referencia:
+        referencia = _ler(*_caminho_aba(args.referencia))
+        if COLUNA_REFERENCIA not in referencia:
+            ap.error(f"--referencia {args.referencia}: sem a coluna {COLUNA_REFERENCIA} "
+                     "(escolha a aba com arquivo.xlsx:Aba)")
+        regras = anexar_referencia(regras, referencia)
+        sem = regras[COLUNA_REFERENCIA].isna().sum()
+        if sem:
+            print(f"{sem} regras sem {COLUNA_REFERENCIA} na referência (o comparativo as descarta)")
+    else:  # a coluna existe sempre; vazia, o comparativo4 recusa o arquivo com a causa
+        regras[COLUNA_REFERENCIA] = np.nan
+        print(f"Sem --referencia: coluna {COLUNA_REFERENCIA} vazia (o comparativo4 não aceita esta saída)")
+    if args.saida.suffix.lower() == ".xlsx":
+        regras.to_excel(args.saida, sheet_name="Planilha1", index=False)
+    else:
+        regras.to_csv(args.saida, index=False)
+    print(f"{len(regras)} regras de {len(prs)} PRs -> {args.saida} "
+          f"(leitura {t1 - t0:.2f}s, mineração {t2 - t1:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
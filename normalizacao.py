@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Normalizações dos antecedentes/consequentes (norm_*, ANT_CONFIG, ordem dos
+# consequentes) e o registro que as aplica, usados pelo comparativo4 e pelo
+# comparativo (exportação do cubo).
+# Cada norm_* roda uma vez por categoria distinta (não por linha) e o
+# resultado fica num LRU; a saída já é um Categorical ordenado na ordem
+# configurada, dispensando pd.Categorical + sort_values depois.
+#
+# Requisitos: pip install pandas numpy
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def _identidade(v):
+    return v
+
+
+class RegistroNormalizadores:
+    def __init__(self, ant_config: dict, norm_conseq, conseq_order, maxsize: int = 4096):
+        self.ant_config = ant_config
+        self.norm_conseq = norm_conseq
+        self.conseq_order = list(conseq_order)
+        self._normalizar = lru_cache(maxsize=maxsize)(self._normalizar_valor)
+
+    def _normalizar_valor(self, ant, valor):
+        # ant=None -> consequente
+        if ant is None:
+            return self.norm_conseq(valor)
+        return self.ant_config.get(ant, (_identidade, None))[0](valor)
+
+    def ordem_configurada(self, ant=None):
+        if ant is None:
+            return self.conseq_order
+        return self.ant_config.get(ant, (None, []))[1]
+
+    def categorizar(self, serie: pd.Series, ant=None) -> pd.Series:
+        """Normaliza os valores de um antecedente (ou os consequentes, se ant=None).
+
+        Devolve um Categorical ordenado: primeiro a ordem configurada, depois os
+        valores fora dela em ordem alfabética.
+        """
+        cat = serie.astype("category").cat.remove_unused_categories()
+        destino = [self._normalizar(ant, v) for v in cat.cat.categories]
+
+        ordem = list(self.ordem_configurada(ant))
+        conhecidos = set(ordem)
+        ordem += sorted({d for d in destino if d not in conhecidos}, key=str)
+        posicao = {v: i for i, v in enumerate(ordem)}
+
+        mapa = np.array([posicao[d] for d in destino] + [-1], dtype=np.int64)
+        codigos = mapa[cat.cat.codes.to_numpy()]  # código -1 (NaN) cai no -1 final
+        return pd.Series(pd.Categorical.from_codes(codigos, categories=ordem, ordered=True),
+                         index=serie.index, name=serie.name)
+
+    def categorizar_valores(self, df: pd.DataFrame, col_ant: str = "Antecedente",
+                            col_val: str = "ValorAnt") -> pd.Series:
+        """ValCat de todas as linhas de uma vez, normalizando cada par (antecedente, valor) distinto."""
+        codigos, pares = pd.factorize(pd.MultiIndex.from_arrays([df[col_ant], df[col_val]]))
+        destino = [self._normalizar(a, v) for a, v in pares]
+        cod, categorias = pd.factorize(pd.Series(destino, dtype=object), sort=True)
+        cod = np.append(cod, -1)  # código -1 (par com NaN) continua NaN
+        return pd.Series(pd.Categorical.from_codes(cod[codigos], categories=categorias),
+                         index=df.index, name="ValCat")
+
+    def normalizar_regras(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cópia de df com ConsCat e ValCat (categorias na ordem configurada)."""
+        df = df.copy()
+        # cada norm_* roda uma vez por categoria distinta, já na ordem canônica
+        df["ConsCat"] = self.categorizar(df["Consequente"])
+        df["ValCat"] = self.categorizar_valores(df)
+        return df
+
+    def info_cache(self):
+        return self._normalizar.cache_info()
+
+
+# Ordem canônica dos consequentes (ajuste se necessário)
+CONSEQ_ORDER = ["very short", "short", "medium", "lengthy"]
+
+# Normalização dos consequentes -> very short / short / medium / lengthy
+def norm_conseq(c: str):
+    s = str(c).strip().lower()
+    if "very" in s and "short" in s: return "very short"
+    if "short" in s and "very" not in s: return "short"
+    if "medium" in s: return "medium"
+    if "length" in s or "long" in s: return "lengthy"
+    return s
+
+# Normalizações por antecedente e ordem desejada de valores
+def norm_lines(v: str):
+    s = str(v).strip().lower()
+    if "1" in s or s in {"one line","single line","1 line"}: return "1 line"
+    if "some" in s or "few" in s:                            return "some lines"
+    if "many" in s or "several" in s:                        return "many lines"
+    return v
+
+def norm_files(v: str):
+    s = str(v).strip().lower()
+    if "1" in s or "one" in s:   return "1 file"
+    if "some" in s or "few" in s:return "some files"
+    if "many" in s or "several" in s: return "many files"
+    return v
+
+def norm_commits(v: str):
+    s = str(v).strip().lower()
+    if "1" in s or "one" in s:     return "1 commit"
+    if "some" in s or "few" in s:  return "some commits"
+    if "many" in s or "several" in s: return "many commits"
+    return v
+
+def norm_bool(v: str):
+    s = str(v).strip().lower()
+    if s in {"true","yes","sim"}:  return "True"
+    if s in {"false","no","não","nao"}: return "False"
+    return v
+
+def norm_followers(v: str):
+    s = str(v).strip().lower()
+    if "no" in s and "follower" in s:  return "no followers"
+    if "has" in s or "sim" in s or "true" in s: return "has followers"
+    return v
+
+def norm_reqexp(v: str):
+    s = str(v).strip().lower()
+    if "no" in s: return "no contribution"
+    if "some" in s or "few" in s: return "some contributions"
+    if "many" in s or "several" in s: return "many contributions"
+    return v
+
+def norm_typedev(v: str):
+    s = str(v).strip().lower()
+    if s.startswith("core"):     return "core"
+    if s.startswith("extern"):   return "external"
+    return s or "(blank)"
+
+
+# Mapa de antecedentes conhecidos → (função de normalização, ordem de valores)
+ANT_CONFIG = {
+    "total_lines_D":                (norm_lines,    ["1 line", "some lines", "many lines"]),
+    "changedFiles_D":               (norm_files,    ["1 file", "some files", "many files"]),
+    "commitsPull_D":                (norm_commits,  ["1 commit", "some commits", "many commits"]),
+    "first_Pull":                   (norm_bool,     ["True", "False"]),
+    "coreTeamFollowsRequester":     (norm_bool,     ["True", "False"]),
+    "followers_boolean":            (norm_followers,["no followers", "has followers"]),
+    "typeDeveloper":                (norm_typedev, ["external", "core"]),
+    "requester_experience_project": (norm_reqexp,   ["no contribution", "some contributions", "many contributions"]),
+    # Se tiver outros, adicione aqui…
+}
+
+# No cenário de lifetime, life_time também aparece como antecedente, com os
+# mesmos valores dos consequentes (very short ... lengthy)
+ANT_CONFIG_LIFETIME = {**ANT_CONFIG, "life_time": (norm_conseq, CONSEQ_ORDER)}
+
+# Antecedentes conhecidos: filtro do comparativo e atributos minerados pelo
+# mineracao (lista vazia = sem filtro no comparativo)
+ANTECEDENTES_VALIDOS = [
+    "changedFiles_D",
+    "commitsPull_D",
+    "requester_experience_project",
+    "total_lines_D",
+    "coreTeamFollowsRequester",
+    "first_Pull",
+    "followers_boolean",
+    "life_time",
+    "typeDeveloper",
+]
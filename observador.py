@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+# Modo observador do comparativo4: fica rodando com as regras e o cubo de cada
+# cenário em memória e, quando uma planilha muda, reagrega só os antecedentes
+# afetados e redesenha só os gráficos que mudaram (manifesto).
+#
+#   python observador.py CenarioApenasLifetime.xlsx pasta/ --jobs 2 --perfil rascunho
+#
+# As planilhas são verificadas por polling (mtime/tamanho, sem dependência
+# extra); uma alteração só é processada quando o arquivo fica igual em duas
+# verificações seguidas (o Excel grava em etapas). Leitura e render rodam num
+# pool de processos que fica vivo entre as atualizações: figuras e estilo já
+# estão montados nos workers e cada atualização paga só a leitura do arquivo
+# e os gráficos afetados.
+#
+# A leitura é sempre da planilha inteira: o xlsx não tem leitura parcial e o
+# cache Parquet (cache_planilha) é invalidado pela própria alteração. O que é
+# incremental é o resto: o diff é feito nas regras já lidas (hash por
+# antecedente) e só os antecedentes que mudaram são reagregados e redesenhados.
+#
+# Com um cenário só a saída é a do comparativo4 (GraficosGerados_TODOS);
+# com vários, uma pasta por cenário como no lote.py.
+#
+# Requisitos: pip install pandas matplotlib openpyxl
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import comparativo4
+from agregacao import agregar_cubo
+from cache_planilha import carregar_com_cache
+from cubo_mapeado import publicar_cubo
+from leitura_streaming import COLUNAS_REGRAS
+from lote import OUT_BASE, listar_cenarios, nome_cenario
+from manifesto import remover_orfaos, salvar_manifesto
+from renderizador import PERFIS_SAIDA, renderizador_cubo, renderizador_padrao
+
+# =================== CONFIGURE AQUI ===================
+INTERVALO = 1.0  # segundos entre verificações das planilhas
+# ======================================================
+
+
+def _estado_arquivo(caminho: Path):
+    try:
+        st = Path(caminho).stat()
+    except OSError:  # removido ou no meio de um rename
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def ler_regras(caminho: Path, aba=None) -> pd.DataFrame:
+    """Regras normalizadas (com ValCat/ConsCat) de uma planilha; roda num worker."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if Path(caminho).suffix.lower() == ".csv":
+            df = comparativo4.montar_regras(pd.read_csv(caminho, usecols=list(COLUNAS_REGRAS)))
+        else:
+            df = carregar_com_cache(comparativo4.carregar_df, caminho, aba)
+    return comparativo4.normalizar_regras(df)
+
+
+def impressoes(df: pd.DataFrame) -> dict:
+    """Antecedente -> hash das suas regras (independe da ordem das linhas)."""
+    colunas = [c for c in df.columns if c not in ("ValCat", "ConsCat")]
+    hashes = pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+    grupos = df.groupby("Antecedente", observed=True).indices
+    return {ant: hashlib.sha1(np.sort(hashes[idx]).tobytes()).hexdigest() for ant, idx in grupos.items()}
+
+
+def antecedentes_afetados(antes: dict, depois: dict) -> set:
+    return {ant for ant in antes.keys() | depois.keys() if antes.get(ant) != depois.get(ant)}
+
+
+def atualizar_cubo(cubo: pd.DataFrame, df: pd.DataFrame, afetados) -> pd.DataFrame:
+    """Troca no cubo só as células dos antecedentes afetados (os demais ficam como estão)."""
+    afetados = list(afetados)
+    novo = agregar_cubo(df[df["Antecedente"].isin(afetados)])
+    resto = cubo[~cubo.index.get_level_values(0).isin(afetados)]
+    return pd.concat([resto, novo]).sort_index()
+
+
+def _aquecer(perfil: str, saida: str):
+    # importa o matplotlib e aplica o estilo no worker antes da 1ª alteração
+    (renderizador_cubo if saida == "cubo" else renderizador_padrao)(perfil)
+    return os.getpid()
+
+
+class Cenario:
+    """Estado em memória de uma planilha observada."""
+
+    def __init__(self, caminho: Path, aba, out_dir: Path):
+        self.caminho = Path(caminho)
+        self.aba = aba
+        self.out_dir = out_dir
+        self.nome = nome_cenario(self.caminho, aba)
+        self.df = None
+        self.cubo = None
+        self.impressoes = {}
+        self.processado = None  # (mtime, tamanho) da versão que está no cubo
+        self.visto = None       # último (mtime, tamanho) visto no polling
+        self.tarefa = None      # atualização em andamento
+
+
+def _fim_atualizacao(cen: Cenario, estado, tarefa: asyncio.Future):
+    # ninguém espera a tarefa: o erro sai aqui (senão fica só no "never retrieved"
+    # do asyncio) e o cenário só é tentado de novo quando a planilha mudar
+    if cen.tarefa is tarefa:
+        cen.tarefa = None
+    if tarefa.cancelled():
+        return
+    erro = tarefa.exception()
+    if erro is not None:
+        cen.processado = estado
+        print(f"[{cen.nome}] atualização falhou ({type(erro).__name__}: {erro}); aguardando nova alteração")
+
+
+class Observador:
+    def __init__(self, entradas, aba=None, out_base: Path = None, jobs: int = 1,
+                 intervalo: float = INTERVALO, saida: str = "png", agrupar: str = "antecedente",
+                 perfil: str = "publicacao"):
+        self.entradas = entradas
+        self.aba = aba
+        self.out_base = out_base
+        self.jobs = jobs if jobs and jobs > 0 else (os.cpu_count() or 1)
+        self.intervalo = intervalo
+        self.saida, self.agrupar, self.perfil = saida, agrupar, perfil
+        self.cenarios = {}
+
+    def _out_dir(self, caminho, aba):
+        if self.out_base is None:
+            return comparativo4.OUT_DIR
+        return self.out_base / nome_cenario(caminho, aba)
+
+    async def atualizar(self, cen: Cenario, estado):
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        try:
+            df = await loop.run_in_executor(self.pool, ler_regras, cen.caminho, cen.aba)
+        except Exception as e:  # planilha inválida: só tenta de novo quando ela mudar
+            print(f"[{cen.nome}] erro na leitura ({type(e).__name__}: {e}); aguardando nova alteração")
+            cen.processado = estado
+            return
+        t_leitura = time.perf_counter() - t0
+
+        novas = impressoes(df)
+        afetados = antecedentes_afetados(cen.impressoes, novas)
+        inicial = cen.cubo is None
+        if inicial:
+            cen.cubo = agregar_cubo(df)
+        elif afetados:
+            cen.cubo = atualizar_cubo(cen.cubo, df, afetados)
+        cen.df, cen.impressoes, cen.processado = df, novas, estado
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            saidas, pendentes, entradas, orfaos = comparativo4.planejar_saidas(
+                cen.cubo, cen.out_dir, False, self.saida, self.agrupar, self.perfil)
+        remover_orfaos(orfaos)
+        t1 = time.perf_counter()
+        # os workers leem o cubo mapeado (cubo_mapeado.py): a tarefa leva só os códigos
+        with publicar_cubo(cen.cubo, comparativo4.CONSEQ_ORDER) as mapeado:
+            tarefas = comparativo4.tarefas_mapeadas(pendentes, cen.cubo, mapeado, self.saida, self.perfil)
+            resultados = await asyncio.gather(*(loop.run_in_executor(self.pool, comparativo4._renderizar_mapeado, t)
+                                                for t in tarefas), return_exceptions=True)
+        falhas = [r for r in resultados if isinstance(r, Exception)]
+        if falhas:  # sem manifesto: os que falharam são tentados de novo na próxima alteração
+            print(f"[{cen.nome}] {len(falhas)} gráficos falharam; 1º: {type(falhas[0]).__name__}: {falhas[0]}")
+        else:
+            salvar_manifesto(cen.out_dir, entradas)
+
+        quais = ", ".join(sorted(afetados, key=str.lower)) or "nenhum"
+        print(f"[{cen.nome}] " + ("carga inicial" if inicial else f"antecedentes alterados: {quais}") +
+              f"; {len(pendentes)} de {len(saidas)} "
+              f"arquivos redesenhados, {len(orfaos)} removidos — {time.perf_counter() - t0:.2f}s "
+              f"(leitura {t_leitura:.2f}s, render {time.perf_counter() - t1:.2f}s)")
+
+    def verificar(self):
+        """Uma rodada do polling: agenda a atualização dos cenários cuja planilha estabilizou."""
+        vistos = set()
+        for caminho, aba in listar_cenarios(self.entradas, self.aba):
+            chave = (Path(caminho).resolve(), aba)
+            vistos.add(chave)
+            cen = self.cenarios.get(chave)
+            if cen is None:
+                cen = self.cenarios[chave] = Cenario(caminho, aba, self._out_dir(caminho, aba))
+            estado = _estado_arquivo(caminho)
+            estavel, cen.visto = estado == cen.visto, estado
+            if estado is None or not estavel or estado == cen.processado:
+                continue
+            if cen.tarefa is None or cen.tarefa.done():
+                cen.tarefa = asyncio.ensure_future(self.atualizar(cen, estado))
+                cen.tarefa.add_done_callback(partial(_fim_atualizacao, cen, estado))
+        for chave in self.cenarios.keys() - vistos:  # planilha apagada: esquece o estado
+            print(f"[{self.cenarios.pop(chave).nome}] planilha sumiu; deixando de observar")
+
+    async def rodar(self, ciclos: int = 0):
+        """Verifica as planilhas a cada `intervalo` s (ciclos=0: até Ctrl+C)."""
+        with ProcessPoolExecutor(max_workers=self.jobs,
+                                 initializer=comparativo4._iniciar_worker) as self.pool:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self.pool, _aquecer, self.perfil, self.saida)
+                                   for _ in range(self.jobs)))
+            n = 0
+            while not ciclos or n < ciclos:
+                self.verificar()
+                n += 1
+                await asyncio.sleep(self.intervalo)
+            pendentes = [c.tarefa for c in self.cenarios.values() if c.tarefa is not None]
+            await asyncio.gather(*pendentes, return_exceptions=True)  # erros já saíram no _fim_atualizacao
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Observa planilhas e redesenha os gráficos afetados a cada alteração.")
+    ap.add_argument("entradas", nargs="*", default=[str(comparativo4.XLSX_PATH)],
+                    help="planilhas (arquivo.xlsx ou arquivo.xlsx:Aba), CSVs ou pastas")
+    ap.add_argument("--aba", default=comparativo4.SHEET_NAME,
+                    help="aba usada quando a entrada não diz qual")
+    ap.add_argument("--saida-base", type=Path, default=None,
+                    help=f"uma pasta por cenário aqui (padrão: {comparativo4.OUT_DIR} com um "
+                         f"cenário, {OUT_BASE} com vários)")
+    ap.add_argument("--jobs", type=int, default=1, help="processos de leitura/render (0 = todos os núcleos)")
+    ap.add_argument("--intervalo", type=float, default=INTERVALO, help="segundos entre verificações")
+    ap.add_argument("--saida", choices=["png", "pdf", "folha", "cubo"], default=comparativo4.SAIDA)
+    ap.add_argument("--agrupar", choices=["antecedente", "execucao"], default=comparativo4.AGRUPAR)
+    ap.add_argument("--perfil", choices=sorted(PERFIS_SAIDA), default=comparativo4.PERFIL)
+    ap.add_argument("--ciclos", type=int, default=0, help="para depois de N verificações (0 = não para)")
+    args = ap.parse_args(argv)
+
+    out_base = args.saida_base
+    if out_base is None and len(listar_cenarios(args.entradas, args.aba)) > 1:
+        out_base = OUT_BASE
+    obs = Observador(args.entradas, args.aba, out_base, args.jobs, args.intervalo,
+                     args.saida, args.agrupar, args.perfil)
+    print(f"Observando {', '.join(args.entradas)} a cada {args.intervalo:g}s (Ctrl+C para sair)")
+    try:
+        asyncio.run(obs.rodar(args.ciclos))
+    except KeyboardInterrupt:
+        print("\nEncerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Ranking das maiores discrepâncias entre o nosso Lift e o da referência
+# (Daricélio): top-N por antecedente e top-N geral numa única passada.
+# Em vez de ordenar cada grupo inteiro (sort_values + head), cada grupo faz uma
+# seleção parcial (np.partition) e só os candidatos ao top-N são ordenados.
+#
+# Requisitos: pip install pandas numpy
+
+import numpy as np
+import pandas as pd
+
+TOPN = 10
+CASAS_EMPATE = 6
+
+
+def _abs(a, b):
+    return np.abs(a - b)
+
+
+def _rel(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.abs(a - b) / np.abs(b)
+
+
+def _razao(a, b):
+    # lift ratio nos dois sentidos: 2x acima ou 2x abaixo da referência pesam igual
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum(a / b, b / a)
+
+
+# chave de ranking -> função (lift, referência) -> discrepância (maior = pior)
+CHAVES_RANKING = {
+    "abs": _abs,      # |Lift - Ref|   (o AbsDiff do comparativo.py)
+    "rel": _rel,      # |Lift - Ref| / |Ref|
+    "razao": _razao,  # max(Lift/Ref, Ref/Lift)
+}
+
+
+def discrepancia(df: pd.DataFrame, chave: str = "abs", col_a: str = "Lift",
+                 col_b: str = "Daricelio") -> np.ndarray:
+    """Valor da chave de ranking por linha (NaN onde não dá para calcular, ex.: Ref = 0).
+
+    Arredonda em CASAS_EMPATE: diferenças que só existem abaixo da precisão do
+    float32 da tabela compacta contam como empate (desempata a ordem das linhas).
+    """
+    a = df[col_a].to_numpy(dtype=np.float64)
+    b = df[col_b].to_numpy(dtype=np.float64)
+    valores = np.round(CHAVES_RANKING[chave](a, b), CASAS_EMPATE)
+    return np.where(np.isfinite(valores), valores, np.nan)
+
+
+def _top_posicoes(valores: np.ndarray, n: int) -> np.ndarray:
+    """Posições dos n maiores, em ordem decrescente; empates: quem vem antes na tabela."""
+    posicoes = np.flatnonzero(~np.isnan(valores))
+    if len(posicoes) > n:
+        corte = -np.partition(-valores[posicoes], n - 1)[n - 1]  # n-ésimo maior
+        posicoes = posicoes[valores[posicoes] >= corte]
+    ordem = np.lexsort((posicoes, -valores[posicoes]))[:n]
+    return posicoes[ordem]
+
+
+def ranquear(df: pd.DataFrame, topn: int = TOPN, chave: str = "abs", por="Antecedente",
+             col_a: str = "Lift", col_b: str = "Daricelio") -> pd.DataFrame:
+    """Top-N linhas de maior discrepância em cada grupo de `por` (por=None: top-N geral).
+
+    Devolve as linhas do df (todas as colunas) + "Discrepancia" e "Posicao"
+    (1 = maior do grupo), agrupadas na ordem dos grupos e decrescentes dentro
+    de cada um — pronto para o plot_barras_duplas.
+    """
+    valores = discrepancia(df, chave, col_a, col_b)
+    if por is None:
+        selecao = [_top_posicoes(valores, topn)]
+    else:
+        codigos, grupos = pd.factorize(df[por], sort=True)
+        if len(grupos) < np.iinfo(np.int16).max:
+            codigos = codigos.astype(np.int16)  # sort estável de int16 é radix: O(n)
+        # agrupa as posições por código (sort estável) e corta cada grupo pelo bincount
+        ordem = np.argsort(codigos, kind="stable")
+        inicio = np.count_nonzero(codigos < 0)  # NaN no grupo (código -1) fica de fora
+        limites = inicio + np.cumsum(np.bincount(codigos[codigos >= 0], minlength=len(grupos)))
+        selecao = []
+        for fim in limites:
+            grupo = ordem[inicio:fim]
+            selecao.append(grupo[_top_posicoes(valores[grupo], topn)])
+            inicio = fim
+    linhas = np.concatenate(selecao) if selecao else np.array([], dtype=np.intp)
+
+    ranking = df.iloc[linhas].copy()
+    ranking["Discrepancia"] = valores[linhas]
+    ranking["Posicao"] = np.concatenate([np.arange(1, len(s) + 1) for s in selecao]) \
+                         if selecao else np.array([], dtype=int)
+    return ranking
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Utilitários compartilhados pelos scripts comparativo*.py para montar a
+# tabela de regras (Antecedente / ValorAnt / Consequente) a partir do XLSX.
+#
+# A tabela é compacta: textos como categorias (códigos inteiros + dicionário
+# de valores distintos), medidas em float32 e rótulos "ant = valor → cons"
+# montados só quando alguém pede (linhas plotadas ou exportação).
+#
+# Requisitos: pip install pandas numpy
+
+import numpy as np
+import pandas as pd
+
+
+def separar_antecedentes(serie: pd.Series, sublinhado: bool = False) -> pd.DataFrame:
+    """Separa "Antecendente=valor" em duas colunas categóricas (Antecedente, ValorAnt).
+
+    Mesma regra do antigo split_antecedente_valor: corta no primeiro "=" e tira
+    espaços; sem "=", o texto inteiro vira antecedente e o valor fica "".
+    Com sublinhado=True (comparativo4), textos sem "=" mas com "_" são cortados
+    no primeiro "_" e os demais "_" do valor viram espaço.
+    """
+    # o split é feito só uma vez por texto distinto; as linhas herdam pelos códigos
+    codigos, textos = _textos_distintos(serie)
+
+    partes = textos.str.partition("=")
+    ant = partes[0].str.strip()
+    val = partes[2].str.strip()
+
+    if sublinhado:
+        alt = textos.str.partition("_")
+        usa_alt = (partes[1] == "") & (alt[1] != "")
+        ant = ant.where(~usa_alt, alt[0].str.strip())
+        val = val.where(~usa_alt, alt[2].str.replace("_", " ", regex=False).str.strip())
+
+    return pd.DataFrame({
+        "Antecedente": _categorico(ant, codigos),
+        "ValorAnt": _categorico(val, codigos),
+    }, index=serie.index)
+
+
+def _textos_distintos(serie: pd.Series):
+    """(código de cada linha, str() de cada valor distinto), como o str(s) do loop antigo."""
+    codigos, unicos = pd.factorize(serie)
+    if pd.api.types.infer_dtype(unicos, skipna=False) not in ("string", "empty"):
+        # números/bool: o factorize junta 1, 1.0 e True, que o str() separa
+        codigos, unicos = pd.factorize(pd.Series([str(v) for v in serie], dtype=object))
+    textos = [str(u) for u in unicos]
+    faltantes = codigos < 0
+    if faltantes.any():
+        # vazios: o factorize junta None com NaN, mas str() dá "None" e "nan"
+        cod, extras = pd.factorize(pd.Series([str(v) for v in serie.to_numpy()[faltantes]],
+                                             dtype=object))
+        codigos = codigos.copy()
+        codigos[faltantes] = cod + len(textos)
+        textos += list(extras)
+    return codigos, pd.Series(textos, dtype=object)
+
+
+def _categorico(valores_unicos: pd.Series, codigos):
+    cod, categorias = pd.factorize(valores_unicos, sort=True)
+    return pd.Categorical.from_codes(cod[codigos], categories=categorias)
+
+
+def _categorico_textos(serie: pd.Series):
+    # mesmo resultado de serie.astype(str) como categoria, com um str() por valor distinto
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    return _categorico(pd.Series([str(u) for u in unicos], dtype=object), codigos)
+
+
+def montar_tabela(raw: pd.DataFrame, medidas: dict, sublinhado: bool = False,
+                  col_ante: str = "Antecendente", col_cons: str = "Consequente") -> pd.DataFrame:
+    """Tabela de regras compacta a partir das colunas do XLSX (inteiro ou um bloco).
+
+    medidas: {coluna do XLSX: nome na tabela}, ex. {"Lift": "BasesPython"}.
+    Antecedente/ValorAnt/Consequente saem categóricos e as medidas em float32;
+    linhas sem alguma das medidas são descartadas.
+    """
+    partes = separar_antecedentes(raw[col_ante], sublinhado=sublinhado)
+    colunas = {
+        "Antecedente": partes["Antecedente"],
+        "ValorAnt": partes["ValorAnt"],
+        "Consequente": pd.Series(_categorico_textos(raw[col_cons]), index=raw.index),
+    }
+    for origem, nome in medidas.items():
+        colunas[nome] = pd.to_numeric(raw[origem], errors="coerce").astype(np.float32)
+    return pd.DataFrame(colunas).dropna(subset=list(medidas.values()), how="any").reset_index(drop=True)
+
+
+def rotulos(df: pd.DataFrame) -> pd.Series:
+    """Rótulo "ant = valor → consequente" de cada linha (um texto por combinação distinta)."""
+    codigos, trios = pd.MultiIndex.from_arrays(
+        [df["Antecedente"], df["ValorAnt"], df["Consequente"]]).factorize()
+    textos = [f"{str(a).strip()} = {str(v).strip()}".strip() + f" \u2192 {str(c).strip()}"
+              for a, v, c in trios]
+    textos = np.array(textos + [""], dtype=object)  # código -1 (NaN) -> ""
+    return pd.Series(textos[codigos], index=df.index, name="LabelFull")
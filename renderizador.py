@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+# Renderizador reutilizável para os gráficos de barras pareadas
+# ("Bases Python" vs "Referência") de comparativo4 e Comparativo3, e para o
+# modo cubo do comparativo4 (mapas de calor valor × consequente).
+#
+# A figura, as barras, os rótulos e os eixos são criados uma única vez (por
+# quantidade de consequentes); a cada gráfico só mudam alturas, posição/texto
+# dos rótulos, ylim, ticks e título antes do savefig. Estilo e fontes são
+# resolvidos uma vez por processo.
+#
+# Os rótulos numéricos das barras (e das células do cubo) são uma camada só
+# por eixo: o contorno de cada texto sai de um cache e todos vão numa única
+# PathCollection, desenhada numa chamada, em vez de um Text por barra (cada
+# Text refaz o layout e rasteriza a fonte no savefig).
+#
+# O matplotlib só é importado quando um gráfico é de fato desenhado: importar
+# este módulo (p/ manifesto, CSV, cache) não paga o custo do matplotlib.
+#
+# Requisitos: pip install numpy matplotlib
+
+from functools import lru_cache
+import os
+import sys
+import time
+
+import numpy as np
+
+# Estilo limpo (fundo branco)
+ESTILO = {
+    "font.family": "Arial",
+    "axes.edgecolor": "black",
+    "axes.linewidth": 1.0,
+    "axes.titlesize": 13,
+    "axes.labelsize": 11,
+    "legend.fontsize": 10,
+    "figure.facecolor": "white"
+}
+COR_BASES = "#4C72B0"
+COR_REFERENCIA = "#8C8C8C"
+MAPA_LIFT = "viridis"  # mapas de calor (modo cubo)
+MAPA_DIFF = "RdBu_r"
+FOLGA_IC = 0.03  # com IC, distância extra entre a aba da barra de erro e o rótulo (fração do eixo y)
+
+
+def modo_lote() -> bool:
+    """Sem tela para abrir janelas: COMPARATIVO_LOTE=1, ou Linux sem DISPLAY/WAYLAND_DISPLAY."""
+    if "COMPARATIVO_LOTE" in os.environ:
+        return os.environ["COMPARATIVO_LOTE"] not in {"", "0"}
+    return sys.platform.startswith("linux") and not (
+        os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def pyplot(interativo: bool = False):
+    """Importa o pyplot na hora do uso; fora do modo interativo (ou em lote) força o Agg."""
+    import matplotlib
+    if not interativo or modo_lote():
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@lru_cache(maxsize=None)
+def fonte_resolvida(familia: str = ESTILO["font.family"]) -> str:
+    """Procura a fonte uma vez por processo.
+
+    Sem ela instalada, devolve a família que o matplotlib usaria no lugar, para
+    não repetir a busca (e o aviso do findfont) a cada texto desenhado.
+    """
+    from matplotlib import font_manager
+    try:
+        font_manager.findfont(font_manager.FontProperties(family=familia),
+                              fallback_to_default=False)
+        return familia
+    except ValueError:
+        return font_manager.fontManager.defaultFamily["ttf"]
+
+
+def aplicar_estilo():
+    import matplotlib.style
+    matplotlib.style.use("default")
+    matplotlib.rcParams.update(ESTILO)
+    matplotlib.rcParams["font.family"] = fonte_resolvida(ESTILO["font.family"])
+
+
+# Perfis de saída: rascunho barato p/ iterar, publicação em 300 dpi, esboço
+# como o rascunho mas sem os números sobre as barras/células.
+# compress_level é o zlib do PNG (None = padrão do Pillow, 6).
+PERFIS_SAIDA = {
+    "publicacao": {"dpi": 300, "compress_level": None},
+    "rascunho":   {"dpi": 100, "compress_level": 1},
+    "esboco":     {"dpi": 100, "compress_level": 1, "rotulos": None},
+}
+
+
+@lru_cache(maxsize=4096)
+def _glifos(texto: str, tamanho: float, va: str = "bottom"):
+    """Contorno do texto (em pontos) centrado em x; va="bottom"/"center" como no ax.text."""
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextPath, TextToPath
+
+    prop = FontProperties(family=fonte_resolvida(), size=tamanho)
+    w, h, d = TextToPath().get_text_width_height_descent(texto, prop, ismath=False)
+    return TextPath((-w/2, d if va == "bottom" else d - h/2), texto, prop=prop)
+
+
+class CamadaRotulos:
+    """Todos os rótulos de um eixo numa única PathCollection.
+
+    Posições em coordenadas de dados (como no ax.text); o tamanho do texto
+    fica em pontos, independente do dpi do savefig.
+    """
+
+    def __init__(self, ax, tamanho=9, cor="#333333", va="bottom"):
+        from matplotlib.collections import PathCollection
+        from matplotlib.transforms import Affine2D
+
+        self.tamanho, self.va = tamanho, va
+        self.colecao = PathCollection([], offsets=np.empty((0, 2)), offset_transform=ax.transData,
+                                      transform=Affine2D().scale(1/72) + ax.figure.dpi_scale_trans,
+                                      facecolors=cor, edgecolors="none", zorder=3, clip_on=False)
+        self.colecao.set_in_layout(False)  # fica dentro do eixo: fora do bbox_inches="tight"
+        ax.add_collection(self.colecao, autolim=False)
+
+    def atualizar(self, x, y, textos, cores=None):
+        self.colecao.set_paths([_glifos(t, self.tamanho, self.va) for t in textos])
+        self.colecao.set_offsets(np.column_stack([x, y]) if len(textos) else np.empty((0, 2)))
+        if cores is not None:
+            self.colecao.set_facecolor(cores)
+
+
+class RenderizadorBarras:
+    """Desenha e salva gráficos de barras pareadas reaproveitando a mesma figura.
+
+    reutilizar=False monta uma figura nova a cada gráfico (comportamento antigo;
+    útil para comparar no benchmark). rotulos: "colecao" (uma camada por
+    eixo), "texto" (um Text por barra, o jeito antigo, p/ o benchmark) ou
+    None (sem números, p/ esboço).
+    """
+
+    def __init__(self, figsize=(8.5, 4.5), width=0.35, dpi=300, compress_level=None,
+                 reutilizar=True, rotulos="colecao"):
+        self.figsize = figsize
+        self.width = width
+        self.dpi = dpi
+        self.compress_level = compress_level
+        self.reutilizar = reutilizar
+        self.rotulos = rotulos
+        self._modelos = {}  # nº de consequentes -> artistas já montados
+        aplicar_estilo()
+
+    def _montar(self, n):
+        from matplotlib.collections import LineCollection
+        from matplotlib.figure import Figure
+
+        width = self.width
+        x = np.arange(n)
+        fig = Figure(figsize=self.figsize)
+        ax = fig.add_subplot()
+        bars1 = ax.bar(x - width/2, np.ones(n), width=width, label="Bases Python", color=COR_BASES)
+        bars2 = ax.bar(x + width/2, np.ones(n), width=width, label="Referência", color=COR_REFERENCIA)
+        # rótulos numéricos das barras; posição e texto mudam a cada gráfico
+        if self.rotulos == "texto":
+            textos = [ax.text(0, 0, "", ha="center", va="bottom", fontsize=9, color="#333333")
+                      for _ in range(2*n)]
+        else:
+            textos = CamadaRotulos(ax, tamanho=9) if self.rotulos else None
+        # barras de erro (IC) de todas as barras numa coleção só; escondida sem IC
+        erros = LineCollection([], colors="#333333", linewidths=1.0, zorder=3, visible=False)
+        ax.add_collection(erros, autolim=False)
+        ax.set_xticks(x, [""]*n)
+        ax.set_xlabel("Consequente")
+        ax.set_ylabel("Lift")
+        titulo = ax.set_title("", pad=20)
+        ax.legend(frameon=False)
+        # eixo X fixo no tamanho do gráfico completo (vale também p/ células vazias)
+        lo, hi = x[0] - width, x[-1] + width
+        ax.set_xlim(lo - 0.05*(hi - lo), hi + 0.05*(hi - lo))
+        fig.subplots_adjust(top=0.88, bottom=0.15, left=0.12, right=0.95)
+        return fig, ax, list(bars1) + list(bars2), textos, erros, titulo
+
+    def _modelo(self, n):
+        if not self.reutilizar:
+            aplicar_estilo()
+            return self._montar(n)
+        if n not in self._modelos:
+            self._modelos[n] = self._montar(n)
+        return self._modelos[n]
+
+    def atualizar(self, y1, y2, labels, title):
+        """Põe os dados de um gráfico no modelo e devolve a figura pronta para salvar.
+
+        y1/y2 podem ser 3×n (média, limite inferior, limite superior): aí cada
+        barra ganha uma barra de erro com o intervalo.
+        """
+        fig, ax, barras, textos, erros, titulo = self._modelo(len(labels))
+
+        alturas, topos, intervalos = _series(y1, y2)
+        segmentos = []
+        for i, (bar, yval) in enumerate(zip(barras, alturas)):
+            bar.set_height(yval)
+            if intervalos is not None and np.isfinite(yval) and np.isfinite(intervalos[:, i]).all():
+                xc = bar.get_x() + bar.get_width()/2
+                segmentos += _segmentos_erro(xc, *intervalos[:, i], bar.get_width()/4)
+        if self.rotulos == "texto":
+            _atualizar_textos(textos, barras, alturas, _altura_rotulos(topos, intervalos))
+        elif textos is not None:
+            _rotular_barras(textos, barras, alturas, _altura_rotulos(topos, intervalos))
+        erros.set_segments(segmentos)
+        erros.set_visible(bool(segmentos))
+
+        ax.set_xticklabels(labels)
+        titulo.set_text(title)
+        ax.set_ylim(0, _ylim_topo(topos))
+        return fig
+
+    def salvar(self, fig, destino):
+        """Salva num arquivo (PNG/PDF pela extensão), num arquivo em memória com
+        .name (gravacao.EmMemoria) ou como nova página de um PdfPages."""
+        if not isinstance(destino, (str, os.PathLike)) and not hasattr(destino, "write"):  # PdfPages
+            destino.savefig(fig, bbox_inches="tight")
+            return
+        formato = os.path.splitext(str(getattr(destino, "name", destino)))[1][1:].lower() or None
+        kwargs = {}
+        if self.compress_level is not None and formato == "png":
+            kwargs["pil_kwargs"] = {"compress_level": self.compress_level}
+        fig.savefig(destino, format=formato, bbox_inches="tight", dpi=self.dpi, **kwargs)
+
+    def desenhar(self, x, y1, y2, labels, title, out_png):
+        t0 = time.perf_counter()
+        fig = self.atualizar(y1, y2, labels, title)
+        t1 = time.perf_counter()
+        self.salvar(fig, out_png)
+        # artistas (atualizar) x savefig (rasterização + PNG): lido pelo --profile
+        self.ultimo_tempo = {"artistas_s": t1 - t0, "savefig_s": time.perf_counter() - t1}
+
+    def desenhar_pdf(self, graficos, destino):
+        """Vários gráficos (x, y1, y2, labels, title), um por página de um único PDF."""
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        with PdfPages(destino) as pdf:
+            for _, y1, y2, labels, title in graficos:
+                self.salvar(self.atualizar(y1, y2, labels, title), pdf)
+
+    def desenhar_folha(self, graficos, destino, titulo=None, colunas=3):
+        """Vários gráficos (x, y1, y2, labels, title) numa única figura em grade."""
+        from matplotlib.figure import Figure
+
+        linhas = -(-len(graficos) // colunas)
+        colunas = min(colunas, len(graficos))
+        larg, alt = self.figsize
+        fig = Figure(figsize=(larg*0.7*colunas, alt*0.8*linhas))
+        eixos = fig.subplots(linhas, colunas, squeeze=False).ravel()
+        width = self.width
+        for ax, (_, y1, y2, labels, title) in zip(eixos, graficos):
+            x = np.arange(len(labels))
+            alturas, topos, intervalos = _series(y1, y2)
+            n = len(labels)
+            bars1 = ax.bar(x - width/2, alturas[:n], width=width, label="Bases Python", color=COR_BASES)
+            bars2 = ax.bar(x + width/2, alturas[n:], width=width, label="Referência", color=COR_REFERENCIA)
+            if intervalos is not None:
+                centros = np.concatenate([x - width/2, x + width/2])
+                ok = np.isfinite(intervalos).all(axis=0) & np.isfinite(alturas)
+                yerr = np.abs(intervalos[:, ok] - alturas[ok])  # distâncias p/ o errorbar
+                ax.errorbar(centros[ok], alturas[ok], yerr=yerr, fmt="none",
+                            ecolor="#333333", elinewidth=0.8, capsize=2)
+            if self.rotulos:
+                _rotular_barras(CamadaRotulos(ax, tamanho=7), list(bars1) + list(bars2), alturas,
+                                _altura_rotulos(topos, intervalos))
+            ax.set_xticks(x, labels, fontsize=8)
+            ax.set_title(title, fontsize=10)
+            lo, hi = x[0] - width, x[-1] + width
+            ax.set_xlim(lo - 0.05*(hi - lo), hi + 0.05*(hi - lo))
+            ax.set_ylim(0, _ylim_topo(topos))
+        for ax in eixos[len(graficos):]:
+            ax.set_visible(False)
+        handles, rotulos = eixos[0].get_legend_handles_labels()
+        fig.legend(handles, rotulos, loc="upper right", frameon=False)
+        if titulo:
+            fig.suptitle(titulo)
+        fig.tight_layout(rect=(0, 0, 1, 0.95))
+        self.salvar(fig, destino)
+
+
+class RenderizadorCubo(RenderizadorBarras):
+    """Matriz valor × consequente de um antecedente em três mapas de calor
+    (Bases Python, Referência e Diferença) numa única figura.
+
+    Cada painel é um imshow só (em vez de uma barra e um rótulo por célula);
+    os modelos são reaproveitados por formato da matriz, como no de barras.
+    anotar=False (ou rotulos=None, perfil esboço) tira o número escrito em
+    cada célula; os números de um painel são uma CamadaRotulos só.
+    """
+
+    def __init__(self, tamanho_celula=(0.9, 0.55), dpi=300, compress_level=None,
+                 anotar=True, reutilizar=True, rotulos="colecao"):
+        super().__init__(figsize=tamanho_celula, dpi=dpi, compress_level=compress_level,
+                         reutilizar=reutilizar, rotulos=rotulos)
+        self.anotar = anotar and bool(rotulos)
+
+    def _montar(self, forma):
+        from matplotlib import colormaps
+        from matplotlib.figure import Figure
+
+        nl, nc = forma
+        larg, alt = self.figsize
+        fig = Figure(figsize=(3*(nc*larg + 1.2), nl*alt + 2.2))
+        eixos = fig.subplots(1, 3, sharey=True)
+        vazio = np.zeros(forma)
+        imagens, textos = [], []
+        for ax, nome, cmap in zip(eixos, ("Bases Python", "Referência", "Diferença"),
+                                  (MAPA_LIFT, MAPA_LIFT, MAPA_DIFF)):
+            # célula sem regra (NaN) fica cinza-claro
+            img = ax.imshow(vazio, cmap=colormaps[cmap].with_extremes(bad="#EEEEEE"),
+                            aspect="auto", interpolation="nearest")
+            fig.colorbar(img, ax=ax, fraction=0.08, pad=0.04)
+            ax.set_title(nome, fontsize=11)
+            ax.set_xticks(np.arange(nc), [""]*nc, rotation=30, ha="right")
+            ax.tick_params(length=0)
+            imagens.append(img)
+            if self.anotar:
+                textos.append(CamadaRotulos(ax, tamanho=8, va="center"))
+        eixos[0].set_yticks(np.arange(nl), [""]*nl)
+        eixos[0].set_ylabel("Valor")
+        titulo = fig.suptitle("")
+        fig.subplots_adjust(top=0.82, bottom=0.25, left=0.15, right=0.97, wspace=0.35)
+        return fig, eixos, imagens, textos, titulo
+
+    def atualizar(self, valores, conseqs, bases, referencia, title):
+        """Põe as matrizes (len(valores) × len(conseqs)) no modelo e devolve a figura."""
+        bases = np.asarray(bases, dtype=float)
+        referencia = np.asarray(referencia, dtype=float)
+        fig, eixos, imagens, textos, titulo = self._modelo(bases.shape)
+
+        # Bases e Referência na mesma escala; Diferença simétrica em torno de 0
+        diff = bases - referencia
+        juntas = np.concatenate([bases.ravel(), referencia.ravel()])
+        lo, hi = (np.nanmin(juntas), np.nanmax(juntas)) if np.isfinite(juntas).any() else (0, 1)
+        amp = np.nanmax(np.abs(diff)) if np.isfinite(diff).any() else 0
+        amp = amp or 1
+        limites = ((lo, hi if hi > lo else lo + 1),)*2 + ((-amp, amp),)
+        for k, (img, dados, clim) in enumerate(zip(imagens, (bases, referencia, diff), limites)):
+            img.set_data(np.ma.masked_invalid(dados))
+            img.set_clim(*clim)
+            if self.anotar:
+                # texto claro sobre célula escura (luminância da cor da célula)
+                cores = img.cmap(img.norm(dados))
+                escuras = (cores[..., :3] @ [0.299, 0.587, 0.114]) < 0.5
+                i, j = np.nonzero(np.isfinite(dados))
+                textos[k].atualizar(j, i, [f"{v:.2f}" for v in dados[i, j]],
+                                    np.where(escuras[i, j, None], (1., 1., 1., 1.), (0., 0., 0., 1.)))
+        for ax in eixos:
+            ax.set_xticklabels(conseqs)
+        eixos[0].set_yticklabels(valores)
+        titulo.set_text(title)
+        return fig
+
+    def desenhar(self, valores, conseqs, bases, referencia, title, out_png):
+        t0 = time.perf_counter()
+        fig = self.atualizar(valores, conseqs, bases, referencia, title)
+        t1 = time.perf_counter()
+        self.salvar(fig, out_png)
+        self.ultimo_tempo = {"artistas_s": t1 - t0, "savefig_s": time.perf_counter() - t1}
+
+
+def _series(y1, y2):
+    """Junta as duas séries: (alturas, topos, intervalos 2×2n ou None).
+
+    Cada série é um vetor de médias ou um 3×n (média, inferior, superior); o
+    topo de cada barra (onde vai o rótulo) é o maior entre média e superior.
+    """
+    y1, y2 = np.asarray(y1, dtype=float), np.asarray(y2, dtype=float)
+    if y1.ndim == 1:
+        alturas = np.concatenate([y1, y2])
+        return alturas, alturas, None
+    juntos = np.concatenate([y1, y2], axis=1)
+    alturas, intervalos = juntos[0], juntos[1:]
+    return alturas, np.fmax(alturas, intervalos[1]), intervalos
+
+
+def _altura_rotulos(topos, intervalos):
+    """Base (y) do rótulo de cada barra: logo acima do topo e, com IC, acima da aba superior."""
+    y = topos + 0.02
+    if intervalos is not None:
+        # a aba da barra de erro fica exatamente no limite superior: afasta o texto dela
+        com_ic = np.isfinite(intervalos).all(axis=0)
+        y[com_ic] += FOLGA_IC * _ylim_topo(topos)
+    return y
+
+
+def _rotular_barras(camada, barras, alturas, ys):
+    """Valor de cada barra (com 2 casas) na altura ys; célula sem regra fica sem rótulo."""
+    ok = np.isfinite(alturas)
+    centros = np.array([bar.get_x() + bar.get_width()/2 for bar in barras])
+    camada.atualizar(centros[ok], ys[ok], [f"{v:.2f}" for v in alturas[ok]])
+
+
+def _atualizar_textos(textos, barras, alturas, ys):
+    # rotulos="texto": um Text por barra
+    for bar, texto, yval, y in zip(barras, textos, alturas, ys):
+        texto.set_visible(not np.isnan(yval))
+        if texto.get_visible():
+            texto.set_position((bar.get_x() + bar.get_width()/2, y))
+            texto.set_text(f"{yval:.2f}")
+
+
+def _segmentos_erro(xc, inf, sup, aba):
+    # haste vertical + as duas abas horizontais
+    return [[(xc, inf), (xc, sup)], [(xc - aba, inf), (xc + aba, inf)], [(xc - aba, sup), (xc + aba, sup)]]
+
+
+def _ylim_topo(alturas):
+    ymax = np.nanmax(alturas) if np.isfinite(alturas).any() else np.nan
+    return ymax*1.2 if np.isfinite(ymax) else 1
+
+
+@lru_cache(maxsize=None)
+def renderizador_padrao(perfil: str = "publicacao"):
+    """Um renderizador por processo e perfil (cada worker do pool monta o seu)."""
+    return RenderizadorBarras(**PERFIS_SAIDA[perfil])
+
+
+@lru_cache(maxsize=None)
+def renderizador_cubo(perfil: str = "publicacao"):
+    return RenderizadorCubo(**PERFIS_SAIDA[perfil])
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Intervalos de confiança (bootstrap) e p-valores (permutação) por célula do
+# cubo (Antecedente, ValCat, ConsCat), para ver quanto da diferença entre
+# "Bases Python" e "Referência" é variação entre as regras da célula.
+#
+# Tudo em lote: as linhas são ordenadas por célula e cada bloco de reamostras
+# é um único sorteio (reamostras x regras) somado por célula com
+# np.add.reduceat — nenhum laço Python por célula. Cada bloco tem a sua
+# semente (SeedSequence.spawn), então o resultado é o mesmo com ou sem
+# processos (jobs).
+#
+# Requisitos: pip install pandas numpy
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+
+from agregacao import CHAVES_CUBO, MEDIDAS_CUBO
+
+REAMOSTRAS = 2000
+NIVEL = 0.95
+SEMENTE = 0
+LIMITE_SORTEIOS = 2_000_000  # reamostras x regras sorteadas por bloco (memória)
+
+
+def _bloco(valores, diff, inicio, n, celula, reamostras, semente):
+    """Um bloco de reamostras: médias bootstrap (b, células, medidas) e contagem da permutação."""
+    rng = np.random.default_rng(semente)
+    # bootstrap: cada regra é trocada por uma regra sorteada da mesma célula
+    idx = inicio[celula] + (rng.random((reamostras, len(celula))) * n[celula]).astype(np.int64)
+    medias = np.add.reduceat(valores[idx], inicio, axis=1) / n[:, None]
+
+    # permutação pareada: sob H0 o sinal de (medida0 - medida1) de cada regra é aleatório
+    sinais = rng.integers(0, 2, (reamostras, len(celula)), dtype=np.int8) * 2 - 1
+    perm = np.add.reduceat(sinais * diff, inicio, axis=1) / n
+    obs = np.add.reduceat(diff, inicio) / n
+    extremos = (np.abs(perm) >= np.abs(obs) - 1e-12).sum(axis=0)
+    return medias.astype(np.float32), extremos
+
+
+def intervalos_cubo(df: pd.DataFrame, medidas=MEDIDAS_CUBO, chaves=CHAVES_CUBO,
+                    reamostras: int = REAMOSTRAS, nivel: float = NIVEL,
+                    semente: int = SEMENTE, jobs: int = 1) -> pd.DataFrame:
+    """IC bootstrap (percentil) da média de cada medida e p-valor por célula.
+
+    Índice igual ao do agregar_cubo; colunas "n", "<medida>_inf", "<medida>_sup"
+    e "p_valor" (permutação pareada de medidas[0] - medidas[1], bilateral).
+    Células com uma regra só ficam com IC e p-valor NaN.
+    """
+    medidas = list(medidas)
+    g = df.groupby(list(chaves), observed=True, sort=True)
+    codigos = g.ngroup().to_numpy()
+    indice = g.size().index
+    if len(indice) == 0:  # nenhuma célula (ex.: nenhum antecedente válido): nada a reamostrar
+        colunas = ["n"] + [f"{m}_{lado}" for m in medidas for lado in ("inf", "sup")] + ["p_valor"]
+        vazio = pd.DataFrame({c: pd.Series(dtype=np.float64) for c in colunas}, index=indice)
+        return vazio.astype({"n": np.int64})
+    ordem = np.argsort(codigos, kind="stable")
+    celula = codigos[ordem]
+    n = np.bincount(celula, minlength=len(indice))
+    inicio = np.concatenate([[0], np.cumsum(n)[:-1]])
+    valores = df[medidas].to_numpy(dtype=np.float64)[ordem]
+    diff = valores[:, 0] - valores[:, 1]
+
+    # blocos de tamanho fixo (só dependem dos dados), um filho da semente por bloco
+    por_bloco = max(1, min(reamostras, LIMITE_SORTEIOS // max(len(celula), 1)))
+    tamanhos = [min(por_bloco, reamostras - i) for i in range(0, reamostras, por_bloco)]
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    args = [(valores, diff, inicio, n, celula, b, s) for b, s in zip(tamanhos, sementes)]
+
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs == 1 or len(args) == 1:
+        partes = [_bloco(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(args))) as pool:
+            partes = list(pool.map(_bloco, *zip(*args)))
+
+    medias = np.concatenate([p[0] for p in partes])  # (reamostras, células, medidas)
+    extremos = sum(p[1] for p in partes)
+    alfa = (1 - nivel) / 2
+    inf, sup = np.quantile(medias, [alfa, 1 - alfa], axis=0)
+
+    res = pd.DataFrame({"n": n}, index=indice)
+    unica = n < 2
+    for j, m in enumerate(medidas):
+        res[f"{m}_inf"] = np.where(unica, np.nan, inf[:, j])
+        res[f"{m}_sup"] = np.where(unica, np.nan, sup[:, j])
+    res["p_valor"] = np.where(unica, np.nan, (1 + extremos) / (reamostras + 1))
+    return res
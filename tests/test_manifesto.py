@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# A assinatura de estilo do manifesto muda quando muda o renderizador (cores,
+# mapas de calor, helpers de módulo), não só o __code__ das funções de desenho.
+#
+# Requisitos: pip install pytest numpy matplotlib
+
+from pathlib import Path
+import importlib.util
+import shutil
+import sys
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import cache_planilha  # noqa: E402
+from manifesto import assinatura_estilo  # noqa: E402
+
+
+def _carregar(caminho: Path, nome: str):
+    spec = importlib.util.spec_from_file_location(nome, caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def test_constante_do_renderizador_muda_assinatura(tmp_path, monkeypatch):
+    # cópia do renderizador numa pasta tratada como a raiz do projeto
+    copia = tmp_path / "renderizador.py"
+    shutil.copy(RAIZ / "renderizador.py", copia)
+    monkeypatch.setattr(cache_planilha, "RAIZ_PROJETO", tmp_path)
+    monkeypatch.delitem(sys.modules, "renderizador_copia", raising=False)
+
+    modulo = _carregar(copia, "renderizador_copia")
+    antes = assinatura_estilo(modulo.RenderizadorBarras, fontes=(modulo,), saida="png")
+    assert assinatura_estilo(modulo.RenderizadorBarras, fontes=(modulo,), saida="png") == antes
+
+    texto = copia.read_text(encoding="utf-8")
+    assert 'COR_BASES = "#4C72B0"' in texto
+    copia.write_text(texto.replace('COR_BASES = "#4C72B0"', 'COR_BASES = "#C44E52ff"'), encoding="utf-8")
+    modulo = _carregar(copia, "renderizador_copia")
+    assert assinatura_estilo(modulo.RenderizadorBarras, fontes=(modulo,), saida="png") != antes
+
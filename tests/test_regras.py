@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# separar_antecedentes contra os loops split_antecedente_valor que ele
+# substituiu (comparativo/comparativo2/Comparativo3 e comparativo4), nas
+# planilhas do repositório e em textos de borda.
+#
+# Requisitos: pip install pytest pandas openpyxl
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from regras import separar_antecedentes  # noqa: E402
+
+PLANILHAS = ["CenarioApenasLifetime.xlsx", "CenarioApenasReviwer.xlsx",
+             "TesteParaReviewerWekaPar.xlsx"]
+
+
+def split_antecedente_valor(s):
+    # comparativo.py / comparativo2.py / Comparativo3.py
+    s = str(s)
+    if "=" in s:
+        a, v = s.split("=", 1)
+        return a.strip(), v.strip()
+    return s.strip(), ""
+
+
+def split_antecedente_valor_sublinhado(s):
+    # comparativo4.py
+    s = str(s)
+    if "=" in s:
+        a, v = s.split("=", 1)
+        return a.strip(), v.strip()
+    if "_" in s:
+        a, v = s.split("_", 1)
+        return a.strip(), v.replace("_", " ").strip()
+    return s.strip(), ""
+
+
+def conferir(serie, sublinhado):
+    antigo = split_antecedente_valor_sublinhado if sublinhado else split_antecedente_valor
+    esperado = [antigo(s) for s in serie]
+    novo = separar_antecedentes(serie, sublinhado=sublinhado)
+    assert list(novo.index) == list(serie.index)
+    assert list(zip(novo["Antecedente"].astype(str), novo["ValorAnt"].astype(str))) == esperado
+
+
+def colunas_antecedente():
+    for nome in PLANILHAS:
+        for aba, df in pd.read_excel(RAIZ / nome, sheet_name=None).items():
+            if "Antecendente" in df:
+                yield pytest.param(df["Antecendente"], id=f"{nome}:{aba}")
+
+
+@pytest.mark.parametrize("sublinhado", [False, True])
+@pytest.mark.parametrize("serie", list(colunas_antecedente()))
+def test_planilhas(serie, sublinhado):
+    conferir(serie, sublinhado)
+
+
+BORDAS = ["=v", "a=", "a_=b", "a_b_c", "_", "=", "a = b = c", "  x  ", "", "sem separador",
+          None, np.nan, pd.NA, 1, 1.0, True, 2.5, "a=v", "a=v"]
+
+
+@pytest.mark.parametrize("sublinhado", [False, True])
+def test_bordas(sublinhado):
+    conferir(pd.Series(BORDAS, dtype=object), sublinhado)
+
+
+@pytest.mark.parametrize("sublinhado", [False, True])
+def test_none_e_nan_separados(sublinhado):
+    serie = pd.Series(["a=b", None, np.nan, None], index=[10, 20, 30, 40], dtype=object)
+    conferir(serie, sublinhado)
+    assert list(separar_antecedentes(serie)["Antecedente"].astype(str)) == ["a", "None", "nan", "None"]
+
+
+def test_coluna_numerica():
+    conferir(pd.Series([1.0, 2.0, np.nan, 1.0]), sublinhado=False)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Posição dos rótulos das barras: com IC o número fica acima da aba superior.
+#
+# Requisitos: pip install pytest numpy matplotlib
+
+from pathlib import Path
+import sys
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from renderizador import _altura_rotulos, _series  # noqa: E402
+
+
+def test_rotulo_acima_do_limite_superior():
+    y1 = [[1.0, 2.0], [0.8, 1.5], [1.4, 2.6]]
+    y2 = [[1.0, 0.5], [np.nan, 0.4], [np.nan, 0.7]]  # 1ª célula da referência sem IC
+    alturas, topos, intervalos = _series(y1, y2)
+    ys = _altura_rotulos(topos, intervalos)
+    sup = intervalos[1]
+    com_ic = np.isfinite(intervalos).all(axis=0)
+    folga = ys[com_ic] - sup[com_ic]
+    assert (folga > 0.02 + 1e-9).all()  # não encosta na aba
+    assert ys[~com_ic] == topos[~com_ic] + 0.02
+
+
+def test_sem_ic_posicao_de_sempre():
+    alturas, topos, intervalos = _series([1.0, 2.0], [0.5, np.nan])
+    np.testing.assert_array_equal(_altura_rotulos(topos, intervalos), topos + 0.02)
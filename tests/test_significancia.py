@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# intervalos_cubo com e sem células (planilha filtrada até não sobrar regra).
+#
+# Requisitos: pip install pytest pandas numpy
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from agregacao import agregar_cubo  # noqa: E402
+from significancia import intervalos_cubo  # noqa: E402
+
+
+def _regras(linhas):
+    df = pd.DataFrame(linhas, columns=["Antecedente", "ValCat", "ConsCat", "BasesPython", "Referencia"])
+    for c in ("Antecedente", "ValCat", "ConsCat"):
+        df[c] = df[c].astype("category")
+    return df.astype({"BasesPython": np.float32, "Referencia": np.float32})
+
+
+def test_sem_celulas():
+    df = _regras([])
+    res = intervalos_cubo(df, reamostras=50)
+    cheio = intervalos_cubo(_regras([("a", "x", "c", 1.0, 0.5), ("a", "x", "c", 2.0, 0.5)]), reamostras=50)
+    assert res.empty
+    assert list(res.columns) == list(cheio.columns)
+    assert list(res.index.names) == ["Antecedente", "ValCat", "ConsCat"]
+    assert agregar_cubo(df).join(res).empty  # como o montar_cubo usa
+
+
+def test_celula_unica_sem_ic():
+    df = _regras([("a", "x", "c", 1.0, 0.5), ("a", "y", "c", 1.0, 0.5), ("a", "y", "c", 3.0, 0.5)])
+    res = intervalos_cubo(df, reamostras=200)
+    assert res.loc[("a", "x", "c"), "n"] == 1
+    assert np.isnan(res.loc[("a", "x", "c"), "p_valor"])
+    assert res.loc[("a", "y", "c"), "BasesPython_inf"] <= 2.0 <= res.loc[("a", "y", "c"), "BasesPython_sup"]